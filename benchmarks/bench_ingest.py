@@ -0,0 +1,334 @@
+"""
+Write session benchmark: local BlizzAPI stand-in, synthetic auctions, local PostgreSQL target.
+
+Serves synthetic auction houses from a stub HTTP server, then runs the ingest path against
+a freshly (re)created benchmark database, twice:
+    - stage pass: every auction house written sequentially, wall time split by ingest stage
+      as recorded by the metrics registry,
+    - cycle: full write session on the worker pool, exactly as controller runs it hourly.
+Each one runs in a separate process, so their peak RSS figures do not mix.
+
+Requires src/handlers/local_settings.py credentials of a PostgreSQL role allowed to create
+databases (and, for '--mode=csv', to COPY from server side files).
+
+Usage: python benchmarks/bench_ingest.py [--mode=csv|stream|async] [--auctions=N] [--realms=N] ...
+       python benchmarks/bench_ingest.py --help
+"""
+
+import argparse
+import multiprocessing
+import re
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import controller
+
+from src.handlers import metrics
+from src.handlers.connection import BlizzApi, DatabaseConnection
+from src.handlers.database import DateTableMaker, RealmTableMaker, RealmWriteHandler
+
+
+# --------------------
+# SYNTHETIC AUCTIONS |
+# --------------------
+TIME_LEFT = ('SHORT', 'MEDIUM', 'LONG', 'VERY_LONG')
+
+
+def synthetic_payload(auctions: int, items: int, zipf: float, seed: int, first_id: int) -> bytes:
+    """
+    Compact BlizzAPI-like auction house body. Item popularity follows Zipf's law,
+    some items are gear (random enchantment, seed), some auctions are bid only.
+    """
+    rng = np.random.default_rng(seed)
+
+    item_ids = (rng.zipf(zipf, auctions) - 1) % items + 1000
+    unit_prices = rng.lognormal(8, 1.5, items).astype(np.int64) + 1
+    quantities = np.where(rng.random(auctions) < 0.6, 1, rng.integers(1, 21, auctions))
+    buyouts = unit_prices[item_ids - 1000] * quantities * rng.uniform(0.8, 1.5, auctions)
+    buyouts = np.where(rng.random(auctions) < 0.03, 0, buyouts.astype(np.int64))
+    gear = rng.random(auctions) < 0.3
+    times_left = rng.choice(len(TIME_LEFT), auctions, p=(0.1, 0.2, 0.3, 0.4))
+
+    entries = [
+        '{"id":%d,"item":{"id":%d%s},"bid":%d,"buyout":%d,"quantity":%d,"time_left":"%s"}' % (
+            first_id + i,
+            item_id,
+            ',"rand":0,"seed":%d' % (i * 7919) if is_gear else '',
+            buyout // 2,
+            buyout,
+            quantity,
+            TIME_LEFT[time_left]
+        )
+        for i, (item_id, buyout, quantity, is_gear, time_left) in enumerate(zip(
+            item_ids.tolist(), buyouts.tolist(), quantities.tolist(), gear.tolist(), times_left.tolist()
+        ))
+    ]
+
+    return (
+        '{"_links":{"self":{"href":"stub"}},"connected_realm":{"href":"stub"},"auctions":['
+        + ','.join(entries)
+        + '],"id":2,"name":"Auction House"}'
+    ).encode()
+
+
+def generate_payloads(path: Path, realm_ids: List[int], auctions: int, items: int, zipf: float) -> int:
+    """
+    Writes one payload file per auction house, returns their total size.
+    """
+    size = 0
+
+    for i, realm_id in enumerate(realm_ids):
+        for j, faction_id in enumerate(RealmWriteHandler.FACTIONS.values()):
+            house = 2 * i + j
+            payload = synthetic_payload(auctions, items, zipf, seed=house, first_id=house * auctions)
+
+            (path / f'{realm_id}_{faction_id}.json').write_bytes(payload)
+            size += len(payload)
+
+    return size
+
+
+# ---------------------
+# BLIZZARD API STUB   |
+# ---------------------
+class StubBlizzApiHandler(BaseHTTPRequestHandler):
+    """
+    OAuth token endpoint and connected realm auctions endpoint, served from payload files.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    AUCTIONS = re.compile(r'^/data/wow/connected-realm/(\d+)/auctions/(\d+)')
+
+    def _send(self, status: int, body: bytes = b'') -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        self._send(200, b'{"access_token":"bench","token_type":"bearer","expires_in":86399}')
+
+    def do_GET(self) -> None:
+        match = self.AUCTIONS.match(self.path)
+        path = match and self.server.payload_path / f'{match[1]}_{match[2]}.json'
+
+        if not path or not path.exists():
+            self._send(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(path.stat().st_size))
+        self.end_headers()
+
+        with open(path, 'rb') as payload:
+            shutil.copyfileobj(payload, self.wfile, 1 << 20)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@contextmanager
+def stub_blizz_api(payload_path: Path):
+    """
+    Runs the stub on a free local port and points BlizzApi, RealmWriteHandler at it.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubBlizzApiHandler)
+    server.payload_path = payload_path
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    BlizzApi.TOKEN_URL = f'{base_url}/oauth/token'
+    RealmWriteHandler.API_URL = base_url
+
+    try:
+        yield base_url
+
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ----------
+# DATABASE |
+# ----------
+def setup_database(database: str) -> None:
+    """
+    (Re)creates an empty benchmark database with all the write session tables.
+    """
+    connection = psycopg2.connect(**dict(DatabaseConnection.PARAMS, database='postgres'))
+    connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+
+    cursor = connection.cursor()
+    cursor.execute(f'DROP DATABASE IF EXISTS {database}')
+    cursor.execute(f'CREATE DATABASE {database}')
+    connection.close()
+
+    # shared by all the handlers, forked processes included
+    DatabaseConnection.PARAMS['database'] = database
+
+    DateTableMaker().START()
+    RealmTableMaker().START()
+
+
+# -------------
+# STAGE PASS  |
+# -------------
+def stage_timings() -> Dict[str, Tuple[float, int]]:
+    """
+    Returns (total seconds, count) of every ingest stage recorded by the metrics registry.
+    Stages nest: 'publish' covers 'live', 'stats', 'delta' and committing the archive, and in streaming
+    modes downloading and parsing overlap with COPY, so they both count as 'copy'.
+    """
+    timings = defaultdict(lambda: (0.0, 0))
+
+    for (handler, stage), entry in metrics.STAGE_SECONDS.collect().items():
+        total, count = timings[stage]
+        timings[stage] = (total + entry[-2], count + entry[-1])
+
+    return dict(timings)
+
+
+def stage_pass(mode: str, delta: bool) -> dict:
+    metrics.registry.reset()
+
+    handler = RealmWriteHandler(stream=mode != 'csv', delta=delta)
+    rows = 0
+
+    jobs = [
+        (realm_id, faction_sign)
+        for realm_id in handler.REALM_LIST_EU
+        for faction_sign in handler.FACTIONS
+    ]
+
+    start = time.perf_counter()
+    for realm_id, faction_sign in jobs:
+        if mode == 'async':
+            api = handler._get_api(realm_id, faction_sign)
+            rows += handler.write_payload(realm_id, faction_sign, api.response.content)
+        else:
+            rows += handler.START(realm_id, faction_sign)
+
+    handler.publish(jobs)
+
+    return {'rows': rows, 'duration': time.perf_counter() - start, 'timings': stage_timings()}
+
+
+# --------
+# CYCLE  |
+# --------
+def cycle(mode: str, delta: bool, workers: int) -> dict:
+    start = time.perf_counter()
+
+    if mode == 'async':
+        results = controller.run_async_auction_writes(workers=workers, delta=delta)
+    else:
+        results = controller.run_auction_writes(stream=mode != 'csv', workers=workers, delta=delta)
+
+    return {
+        'rows':         sum(result['rows'] or 0 for result in results),
+        'failed':       sum(1 for result in results if result['error']),
+        'duration':     time.perf_counter() - start
+    }
+
+
+def _run_isolated(connection, func, args) -> None:
+    result = func(*args)
+
+    # ru_maxrss is in kilobytes on Linux
+    result['peak_rss'] = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    ) * 1024
+
+    connection.send(result)
+
+
+def run_isolated(func, *args) -> dict:
+    """
+    Runs func in a forked process, returns its result together with the process (tree) peak RSS.
+    """
+    context = multiprocessing.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+
+    process = context.Process(target=_run_isolated, args=(sender, func, args))
+    process.start()
+    result = receiver.recv()
+    process.join()
+
+    return result
+
+
+def print_result(name: str, result: dict) -> None:
+    print(f"-----------------------------------")
+    print(f"{name}: {result['rows']} rows in {result['duration']:.2f}s, "
+          f"{result['rows'] / result['duration']:.0f} rows/s, peak RSS {result['peak_rss'] / 2 ** 20:.1f} MB")
+
+    for stage, (seconds, count) in sorted(result.get('timings', {}).items(), key=lambda item: -item[1][0]):
+        print(f"    {stage:<8} {seconds:8.2f}s  {100 * seconds / result['duration']:5.1f}%  {count:4d}x")
+
+    if result.get('failed'):
+        print(f"    failed jobs: {result['failed']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Write session benchmark.')
+    parser.add_argument('--mode', choices=('csv', 'stream', 'async'), default='stream')
+    parser.add_argument('--delta', action='store_true', help='delta ingest mode')
+    parser.add_argument('--auctions', type=int, default=50_000, help='auctions per auction house')
+    parser.add_argument('--items', type=int, default=20_000, help='distinct items')
+    parser.add_argument('--zipf', type=float, default=1.3, help='item popularity skew (> 1)')
+    parser.add_argument('--realms', type=int, default=4, help=f'up to {len(RealmWriteHandler.REALM_LIST_EU)}')
+    parser.add_argument('--workers', type=int, default=controller.SESSION_WORKERS)
+    parser.add_argument('--database', default='auctionation2_bench')
+    parser.add_argument('--skip-stages', action='store_true', help='full cycle only')
+    args = parser.parse_args()
+
+    realm_ids = list(RealmWriteHandler.REALM_LIST_EU)[:args.realms]
+    RealmWriteHandler.REALM_LIST_EU = {realm_id: RealmWriteHandler.REALM_LIST_EU[realm_id] for realm_id in realm_ids}
+
+    payload_path = Path(tempfile.mkdtemp(prefix='bench_ingest_'))
+
+    # '--async' sessions persist Last-Modified headers, keep the real ones intact
+    controller.LAST_MODIFIED_PATH = payload_path / 'last_modified.json'
+
+    try:
+        start = time.perf_counter()
+        size = generate_payloads(payload_path, realm_ids, args.auctions, args.items, args.zipf)
+        print(f"Generated {2 * len(realm_ids)} auction houses, {args.auctions} auctions each, "
+              f"{size / 2 ** 20:.1f} MB in {time.perf_counter() - start:.2f}s")
+
+        setup_database(args.database)
+
+        with stub_blizz_api(payload_path):
+            if not args.skip_stages:
+                print_result(f'Stage pass ({args.mode})', run_isolated(stage_pass, args.mode, args.delta))
+
+            print_result(f'Cycle ({args.mode}, {args.workers} workers)',
+                         run_isolated(cycle, args.mode, args.delta, args.workers))
+
+    finally:
+        shutil.rmtree(payload_path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+StatsCalculator micro-benchmark: columnar engine vs. previous dict-of-lists implementation.
+
+Usage: python benchmarks/bench_stats.py [auctions] [snapshots]
+"""
+
+import sys
+import timeit
+
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from handlers.stats import StatsCalculator
+
+
+def legacy_stats(times: np.ndarray, buyouts: np.ndarray, quantities: np.ndarray) -> Dict[str, dict]:
+    """
+    Previous implementation: per-row price map, then per-snapshot Python loops.
+    """
+    price_date_map: Dict[str, list] = {}
+
+    for date_value, buyout_value, quantity_value in zip(times.tolist(), buyouts.tolist(), quantities.tolist()):
+        date_value = f'{date_value}'
+
+        if not price_date_map.get(date_value):
+            price_date_map[date_value] = []
+
+        price_date_map[date_value].append(buyout_value / quantity_value)
+
+    return {
+        'lowest':   {entry: min(prices) for entry, prices in price_date_map.items()},
+        'mean':     {entry: np.mean(prices) for entry, prices in price_date_map.items()},
+        'median':   {entry: np.median(prices) for entry, prices in price_date_map.items()},
+        'count':    {entry: len(prices) for entry, prices in price_date_map.items()}
+    }
+
+
+def synthetic_data(auctions: int, snapshots: int) -> tuple:
+    """
+    Random auctions of a single item spread evenly over hourly snapshots.
+    """
+    rng = np.random.default_rng(0)
+
+    start = np.datetime64('2022-10-01T00:00:00')
+    times = start + rng.integers(0, snapshots, auctions).astype('timedelta64[h]')
+    quantities = rng.integers(1, 21, auctions)
+    buyouts = quantities * rng.lognormal(8, 1, auctions).astype(np.int64) + 1
+
+    return times.astype('datetime64[s]'), buyouts, quantities
+
+
+def main(auctions: int = 100_000, snapshots: int = 720) -> None:
+    times, buyouts, quantities = synthetic_data(auctions, snapshots)
+
+    legacy = legacy_stats(times, buyouts, quantities)
+    columnar = StatsCalculator.get_all(times, buyouts, quantities)
+
+    # sanity check, both implementations have to agree
+    for key in legacy:
+        for entry in legacy[key]:
+            assert np.isclose(legacy[key][entry], columnar[key][entry]), (key, entry)
+
+    for name, func in (('legacy', legacy_stats), ('columnar', StatsCalculator.get_all)):
+        runs = 5
+        best = min(timeit.repeat(lambda: func(times, buyouts, quantities), number=1, repeat=runs))
+        print(f'{name:<10} {auctions} auctions, {snapshots} snapshots: {best * 1000:.2f} ms (best of {runs})')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
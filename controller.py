@@ -1,14 +1,139 @@
+import asyncio
+import json
 import sys
+import time
 
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.handlers import metrics, multiprocess_manager
+from src.handlers.archive import SnapshotArchive
+from src.handlers.connection import BlizzApi
+from src.handlers.exceptions import BlizzApiError, TimeoutError
+from src.handlers.tracing import query_tracer
 from src.handlers.database import (
     RealmWriteHandler, 
     ItemDataPopulator,
     RealmTableMaker,
+    RealmTableMigrator,
+    ItemStatsTableMaker,
     DateTableMaker,
-    AuctionDeleteHandler
+    AuctionDeleteHandler,
+    AuctionCompactHandler
 )
 
 
+# write session pool size, override with '--workers=N'
+SESSION_WORKERS: int = 8
+
+# attempts on BlizzAPI timeout, override with '--retries=N'
+SESSION_RETRIES: int = 3
+
+# raw auctions retention, then daily stats retention (before weekly rollup),
+# override with '--raw-days=N', '--daily-days=N'
+COMPACT_RAW_DAYS: int = 14
+COMPACT_DAILY_DAYS: int = 90
+
+# BlizzAPI 'Last-Modified' headers kept between sessions, used by '--async' sessions
+LAST_MODIFIED_PATH: Path = Path(__file__).resolve().parent / 'src' / 'cache' / 'last_modified.json'
+
+# '--trace-queries' logs queries slower than this (with their plans), override with '--trace-threshold=MS'
+TRACE_THRESHOLD_MS: int = 200
+TRACE_LOG_PATH: Path = Path(__file__).resolve().parent / 'src' / 'cache' / 'slow_queries.log'
+
+# columnar snapshot archive written by '--archive' sessions, override with '--archive-dir=PATH',
+# '--archive-compress' trades memory-mapped reads for smaller files
+ARCHIVE_PATH: Path = Path(__file__).resolve().parent / 'src' / 'cache' / 'archive'
+
+
+def get_option(args: tuple, name: str, default, cast: Callable = int):
+    """
+    Returns value of a '--name=value' command line option, integer unless told otherwise.
+    """
+    for arg in args:
+        if arg.startswith(f'--{name}='):
+            return cast(arg.split('=', 1)[1])
+
+    return default
+
+
+def get_archive(args: tuple) -> Optional[SnapshotArchive]:
+    """
+    Returns snapshot archive requested with '--archive', if any.
+    """
+    if '--archive' not in args:
+        return None
+
+    return SnapshotArchive(
+        get_option(args, 'archive-dir', ARCHIVE_PATH, cast=Path),
+        compress='--archive-compress' in args
+    )
+
+
+def print_job_result(result: dict) -> None:
+    """
+    Prints single write job outcome.
+    """
+    realm_id, faction_sign = result['job']
+
+    if result['error']:
+        print(f'FAILED  {realm_id}, {faction_sign} after {result["attempts"]} attempt(s): {result["error"]}')
+    else:
+        print(f'DONE    {realm_id}, {faction_sign}: {result["rows"]} rows in {result["duration"]:.2f}s')
+
+
+def staged_jobs(results: List[dict]) -> List[tuple]:
+    """
+    Returns jobs whose auction houses got staged, the ones to be published.
+    Jobs of 0 rows are among them only if BlizzAPI did return an (empty) auctions array,
+    error responses fail their jobs.
+    """
+    return [
+        result['job']
+        for result in results
+        if not result['error'] and not result.get('unchanged')
+    ]
+
+
+def print_session_report(results: List[dict], duration: float) -> None:
+    """
+    Prints write session summary.
+    """
+    failed = [result for result in results if result['error']]
+    rows = sum(result['rows'] or 0 for result in results)
+
+    print(f"-----------------------------------")
+    print(f"Jobs: {len(results)}, failed: {len(failed)}")
+    print(f"Rows written: {rows}")
+    print(f"Session duration: {duration:.2f}s")
+
+    for result in sorted(results, key=lambda result: result['duration'], reverse=True):
+        realm_id, faction_sign = result['job']
+        print(f'    {realm_id}, {faction_sign}: {result["rows"] or 0} rows, {result["duration"]:.2f}s')
+
+    print_session_metrics(results)
+    print(f"-----------------------------------")
+
+
+def print_session_metrics(results: List[dict]) -> None:
+    """
+    Prints time spent in each write stage, summed over all the jobs.
+    Pool workers report their metrics within job results, async sessions record them in place.
+    """
+    for result in results:
+        metrics.registry.merge(result.get('metrics', {}))
+
+    stages = metrics.STAGE_SECONDS.collect()
+    if not stages:
+        return
+
+    print(f"Stages (summed over jobs):")
+    for (handler, stage), entry in sorted(stages.items(), key=lambda item: item[1][-2], reverse=True):
+        total, count = entry[-2], entry[-1]
+        print(f'    {stage:<10} {total:8.2f}s  {count:4d}x  mean {total / count * 1000:8.1f} ms')
+
+
 def run_create_realm_tables() -> None:
     """
     Setup PostgreSQL Realm tables 'realm_{realm_name}'.
@@ -17,6 +142,23 @@ def run_create_realm_tables() -> None:
     handler.START()
 
 
+def run_migrate_realm_tables() -> None:
+    """
+    Migrate existing PostgreSQL Realm tables into daily partitioned, indexed ones,
+    create current snapshot tables seeded with the latest snapshot and item stats tables aggregating migrated history.
+    """
+    handler = RealmTableMigrator()
+    handler.START()
+
+
+def run_create_stats_tables() -> None:
+    """
+    Setup PostgreSQL item stats tables 'item_stats_{realm_name}', aggregating already collected data.
+    """
+    handler = ItemStatsTableMaker()
+    handler.START()
+
+
 def run_create_time_table() -> None:
     """
     Setup PostgreSQL BlizzAPI request time record table 'api_request_time_record'.
@@ -25,17 +167,134 @@ def run_create_time_table() -> None:
     handler.START()
 
 
-def run_auction_writes() -> None:
+def run_auction_writes(stream: bool = True, workers: int = SESSION_WORKERS,
+                       retries: int = SESSION_RETRIES, delta: bool = False,
+                       archive: Optional[SnapshotArchive] = None) -> List[dict]:
     """
-    Fetch and write all the live auctions data.
+    Fetch and write all the live auctions data on a bounded pool of worker processes.
+    Streams auctions straight into the database unless told to use .csv cache files,
+    delta mode stores auction intervals instead of full snapshots.
+    Returns write job results.
     """
-    handler = RealmWriteHandler()
+    handler = RealmWriteHandler(stream=stream, delta=delta, archive=archive)
     print(f"-----------------------------------")
     print(f"Writes Session: {handler.time}")
     print(f"-----------------------------------")
-    for realm_id in handler.REALM_LIST_EU:
-        handler.START(realm_id, 'a')
-        handler.START(realm_id, 'h')
+
+    # single token request per session, inherited by all the worker processes
+    BlizzApi.get_token()
+
+    jobs = [
+        (realm_id, faction_sign)
+        for realm_id in handler.REALM_LIST_EU
+        for faction_sign in handler.FACTIONS
+    ]
+
+    start = time.monotonic()
+    results = multiprocess_manager.run_session(
+        func=       handler.START,
+        jobs=       jobs,
+        workers=    workers,
+        retries=    retries,
+        callback=   print_job_result
+    )
+
+    handler.publish(staged_jobs(results))
+    print_session_report(results, time.monotonic() - start)
+
+    return results
+
+
+async def _write_realms_async(handler: RealmWriteHandler, workers: int, retries: int,
+                              last_modified: Dict[str, str]) -> List[dict]:
+    """
+    Fetches all the auction houses concurrently, handing each response over to a writer thread.
+    Results carry 'Last-Modified' headers of the fetched responses, to be stored once published.
+    """
+    from src.handlers.async_connection import AsyncBlizzApi
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def write_realm(api: AsyncBlizzApi, realm_id: int, faction_sign: str) -> dict:
+        start = time.monotonic()
+        result = {'job': (realm_id, faction_sign), 'rows': 0, 'error': None, 'attempts': 0}
+
+        try:
+            for attempt in range(1, retries + 2):
+                result['attempts'] = attempt
+
+                try:
+                    url = handler.auction_url(realm_id, faction_sign)
+                    payload = await api.fetch(url)
+                    result['last_modified'] = api.modified.get(url)
+                    break
+
+                except (TimeoutError, BlizzApiError):
+                    if attempt > retries:
+                        raise
+                    await asyncio.sleep(5.0 * 2 ** (attempt - 1))
+
+            # None means Auction House has not changed since the last session
+            result['unchanged'] = payload is None
+
+            if payload is not None:
+                result['rows'] = await loop.run_in_executor(
+                    executor, handler.write_payload, realm_id, faction_sign, payload
+                )
+
+        except Exception as e:
+            result['error'] = repr(e)
+
+        result['duration'] = time.monotonic() - start
+        print_job_result(result)
+
+        return result
+
+    async with AsyncBlizzApi(concurrency=workers, last_modified=last_modified) as api:
+        results = await asyncio.gather(*(
+            write_realm(api, realm_id, faction_sign)
+            for realm_id in handler.REALM_LIST_EU
+            for faction_sign in handler.FACTIONS
+        ))
+
+    executor.shutdown()
+
+    return results
+
+
+def run_async_auction_writes(workers: int = SESSION_WORKERS, retries: int = SESSION_RETRIES,
+                             delta: bool = False, archive: Optional[SnapshotArchive] = None) -> List[dict]:
+    """
+    Fetch all the live auctions data with a single pooled asyncio BlizzAPI client,
+    skipping auction houses unchanged since the previous session.
+    Returns write job results.
+    """
+    handler = RealmWriteHandler(delta=delta, archive=archive)
+    print(f"-----------------------------------")
+    print(f"Writes Session (async): {handler.time}")
+    print(f"-----------------------------------")
+
+    last_modified: Dict[str, str] = {}
+    if LAST_MODIFIED_PATH.exists():
+        last_modified = json.loads(LAST_MODIFIED_PATH.read_text())
+
+    start = time.monotonic()
+    results = asyncio.run(_write_realms_async(handler, workers, retries, last_modified))
+
+    jobs = staged_jobs(results)
+    handler.publish(jobs)
+
+    # only published auction houses are skipped by the next session if unchanged,
+    # publish() raising leaves all of them to be fetched again
+    for result in results:
+        if result['job'] in jobs and result.get('last_modified'):
+            last_modified[handler.auction_url(*result['job'])] = result['last_modified']
+
+    LAST_MODIFIED_PATH.write_text(json.dumps(last_modified))
+    print_session_report(results, time.monotonic() - start)
+
+    return results
 
 
 def run_populate_items() -> None:
@@ -54,16 +313,53 @@ def run_delete_data() -> None:
     handler.START()
 
 
+def run_compact_data(raw_days: int = COMPACT_RAW_DAYS, daily_days: int = COMPACT_DAILY_DAYS) -> None:
+    """
+    Downsample historical auctions data and drop raw data beyond retention horizon.
+    """
+    handler = AuctionCompactHandler(raw_days=raw_days, daily_days=daily_days)
+    handler.START()
+
+
 def read_command(*args) -> None:
     """
     Execute code proper to command line argument.
     """
-    if 'run-session' in args:
-        run_auction_writes()
+    if '--trace-queries' in args:
+        query_tracer.enable(
+            threshold=  get_option(args, 'trace-threshold', TRACE_THRESHOLD_MS) / 1000,
+            log_path=   TRACE_LOG_PATH
+        )
+
+    if 'run-session' in args and '--async' in args:
+        run_async_auction_writes(
+            workers=    get_option(args, 'workers', SESSION_WORKERS),
+            retries=    get_option(args, 'retries', SESSION_RETRIES),
+            delta=      '--delta' in args,
+            archive=    get_archive(args)
+        )
+
+    elif 'run-session' in args and '--csv-cache' in args and '--archive' in args:
+        print('--archive is not supported together with --csv-cache.')
+
+    elif 'run-session' in args:
+        run_auction_writes(
+            stream=     '--csv-cache' not in args,
+            workers=    get_option(args, 'workers', SESSION_WORKERS),
+            retries=    get_option(args, 'retries', SESSION_RETRIES),
+            delta=      '--delta' in args,
+            archive=    get_archive(args)
+        )
     
     elif 'run-create-realm-table' in args:
         run_create_realm_tables()
     
+    elif 'run-migrate-realm-table' in args:
+        run_migrate_realm_tables()
+
+    elif 'run-create-stats-table' in args:
+        run_create_stats_tables()
+
     elif 'run-create-time-table' in args:
         run_create_time_table()
 
@@ -72,6 +368,12 @@ def read_command(*args) -> None:
 
     elif 'run-delete-data' in args:
         run_delete_data()
+
+    elif 'run-compact' in args:
+        run_compact_data(
+            raw_days=   get_option(args, 'raw-days', COMPACT_RAW_DAYS),
+            daily_days= get_option(args, 'daily-days', COMPACT_DAILY_DAYS)
+        )
     
     else:
         print('Input command not recognized.')
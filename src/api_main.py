@@ -1,10 +1,66 @@
-from fastapi import FastAPI, HTTPException
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+import os
+import time
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-import json
-from handlers.database import ItemReadHandler, AuctionReadHandler, ItemSearchHandler
+from fastapi.responses import JSONResponse
+from starlette.routing import Match
+from handlers.connection import PooledDatabaseConnection
+from handlers.database import (
+    ItemReadHandler,
+    ItemBatchReadHandler,
+    CrossRealmReadHandler,
+    AuctionReadHandler,
+    ItemSearchHandler
+)
+from handlers import metrics, multiprocess_manager
+from handlers.read_cache import etag_cache
+from handlers.search import search_index
+from handlers.serialization import dumps
+from handlers.snapshot import SnapshotClock, SnapshotListener
+from handlers.tracing import query_tracer
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson (NumPy aware), stdlib encoder as a fallback.
+    Already rendered bytes, e.g. read handlers' cached ones, are sent as they are.
+    """
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+
+        return dumps(content)
+
+
+app = FastAPI(default_response_class=FastJSONResponse)
+
+# database connection pool bounds, handlers run in a threadpool and block while it is exhausted
+DB_POOL_MIN = 2
+DB_POOL_MAX = 20
+
+# invalidates read caches as soon as a write session publishes new snapshot
+snapshot_listener = SnapshotListener(PooledDatabaseConnection.PARAMS)
+
+# slow query tracing (with EXPLAIN plans), off unless QUERY_TRACE_THRESHOLD_MS is set,
+# in milliseconds as controller's '--trace-threshold=MS'
+QUERY_TRACE_THRESHOLD_MS = os.environ.get('QUERY_TRACE_THRESHOLD_MS')
+QUERY_TRACE_LOG_PATH = Path(__file__).resolve().parent / 'cache' / 'slow_queries.log'
 
+# routes which responses only change along with a new snapshot
+SNAPSHOT_ROUTES = ('/items/', '/auctions/', '/compare/')
 
-app = FastAPI()
+# query params making a response user specific (watchlists change any time), never shared nor snapshot bound
+PRIVATE_PARAMS = ('user_id',)
+
+# write sessions run hourly and take a while to complete
+SNAPSHOT_CYCLE = timedelta(hours=1)
+SNAPSHOT_GRACE = timedelta(minutes=10)
 
 origins = [
     'http://127.0.0.1:3000',
@@ -19,6 +75,151 @@ app.add_middleware(
 )
 
 
+def latest_snapshot() -> Optional[datetime]:
+    """
+    Returns latest snapshot time, from memory unless it is stale.
+    """
+    snapshot_time = SnapshotClock.peek()
+    if snapshot_time is not None:
+        return snapshot_time
+
+    db = PooledDatabaseConnection()
+    try:
+        return SnapshotClock.get(db.connection.cursor())
+
+    finally:
+        db.release()
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+@app.middleware("http")
+async def snapshot_caching(request: Request, call_next):
+    """
+    Snapshot bound HTTP caching: ETag of the latest snapshot time, Cache-Control
+    until the next snapshot is expected, 304 on matching If-None-Match with no handler involved,
+    once the URL has been served successfully within this snapshot (so nonexistent items still get errors).
+    User specific requests are never cached by shared caches.
+    """
+    if request.method != 'GET' or not request.url.path.startswith(SNAPSHOT_ROUTES):
+        return await call_next(request)
+
+    if any(param in request.query_params for param in PRIVATE_PARAMS):
+        response = await call_next(request)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    snapshot_time = await run_in_threadpool(latest_snapshot)
+    if snapshot_time is None:
+        return await call_next(request)
+
+    max_age = int((snapshot_time + SNAPSHOT_CYCLE + SNAPSHOT_GRACE - datetime.now()).total_seconds())
+    headers = {
+        'ETag':             f'"{snapshot_time:%Y%m%d%H%M%S}"',
+        'Cache-Control':    f'public, max-age={max(max_age, 60)}'
+    }
+
+    generation = SnapshotClock.generation
+    key = (request.url.path, request.url.query, headers['ETag'])
+
+    if etag_matches(headers['ETag'], request.headers.get('if-none-match', '')) and etag_cache.get(key):
+        return Response(status_code=304, headers=headers)
+
+    response = await call_next(request)
+
+    if response.status_code == 200:
+        response.headers.update(headers)
+        etag_cache.set(key, True, generation)
+
+    return response
+
+
+def route_path(request: Request) -> str:
+    """
+    Returns path template of the route matching the request, keeps metrics label values bounded.
+    """
+    for route in app.routes:
+        if route.matches(request.scope)[0] == Match.FULL:
+            return route.path
+
+    return 'unmatched'
+
+
+# added last, so it wraps all the other middleware, 304 responses included
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+
+    metrics.REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        route=  route_path(request),
+        method= request.method,
+        status= response.status_code
+    )
+
+    return response
+
+
+@app.on_event("startup")
+def startup():
+    """
+    Spawn long-lived statistics process pool and database connection pool once, instead of per request,
+    load item search index.
+    """
+    multiprocess_manager.stats_executor.start()
+
+    # before any connection is opened, pooled ones included
+    if QUERY_TRACE_THRESHOLD_MS:
+        query_tracer.enable(threshold=float(QUERY_TRACE_THRESHOLD_MS) / 1000, log_path=QUERY_TRACE_LOG_PATH)
+
+    PooledDatabaseConnection.init_pool(minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX)
+
+    # in-process item name index, serves item search and auction slug filters
+    db = PooledDatabaseConnection()
+    try:
+        search_index.load(db.connection)
+
+    finally:
+        db.release()
+
+    snapshot_listener.start()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    multiprocess_manager.stats_executor.shutdown()
+    PooledDatabaseConnection.close_pool()
+    snapshot_listener.stop()
+
+
+@app.get("/metrics")
+async def response_metrics():
+    """
+    Returns all the collected metrics in Prometheus text format.
+    """
+    return Response(
+        content=       metrics.registry.render(),
+        media_type=    'text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@app.get("/debug/queries")
+async def response_traced_queries():
+    """
+    Returns traced queries, newest first: slow ones (with their plans) and all the recent ones.
+    Available only while query tracing is enabled.
+    """
+    if not query_tracer.enabled:
+        raise HTTPException(status_code=404)
+
+    return FastJSONResponse(query_tracer.entries())
+
+
 @app.get("/items/{realm_name}/{faction_sign}/{wow_item_id}/")
 async def response_item_data(realm_name: str, faction_sign: str, wow_item_id: int):
     """
@@ -34,40 +235,98 @@ async def response_item_data(realm_name: str, faction_sign: str, wow_item_id: in
     if realm_name not in ItemReadHandler.REALM_LIST_EU.values():
         raise HTTPException(status_code=404)
 
-    # spawn new handler instance, collect all entries, do calculations
-    i = ItemReadHandler(
+    # spawn new handler instance, collect all entries, do calculations (off the event loop)
+    i = await run_in_threadpool(
+        ItemReadHandler,
+        realm_name=     realm_name,
+        faction_sign=   faction_sign,
+        wow_item_id=    wow_item_id
+    )
+    return FastJSONResponse(i.rendered)
+
+
+@app.get("/items/{realm_name}/{faction_sign}/")
+async def response_items_data(realm_name: str, faction_sign: str,
+                              wow_item_id: List[int] = Query(default=[]),
+                              user_id: Optional[int] = None):
+    """
+    Returns item-specific auctions data of many items at once, keyed by item id,
+    each one in the same format as the single item route.
+    Query params: wow_item_id - repeated for every item (up to 100), 
+    user_id - adds all the items observed by the user.
+    """
+    # hardcoded query limit for safety purposes, raises 413: 'Payload Too Large'
+    if len(wow_item_id) > 100:
+        raise HTTPException(status_code=413)
+
+    # wrong realm name handling
+    if realm_name not in ItemReadHandler.REALM_LIST_EU.values():
+        raise HTTPException(status_code=404)
+
+    # single handler instance for all the items
+    i = await run_in_threadpool(
+        ItemBatchReadHandler,
         realm_name=     realm_name,
         faction_sign=   faction_sign,
+        wow_item_ids=   wow_item_id,
+        user_id=        user_id
+    )
+    return FastJSONResponse(i.rendered)
+
+
+@app.get("/compare/{wow_item_id}/")
+async def response_cross_realm_data(wow_item_id: int):
+    """
+    Returns item's latest lowest buyout, median buyout and auctions count
+    on every realm and faction it is listed on, keyed by realm name, then faction sign.
+    """
+    c = await run_in_threadpool(
+        CrossRealmReadHandler,
         wow_item_id=    wow_item_id
     )
-    return i.response
+    return FastJSONResponse(c.rendered)
 
 
 @app.get("/auctions/{realm_name}/{faction_sign}/{wow_item_slug}/")
 async def response_auction_data(realm_name: str, faction_sign: str, wow_item_slug: str, 
-                                page: int = 1, limit: int = 20):
+                                page: int = 1, limit: int = 20, cursor: Optional[str] = None):
     """
     Returns live auctions from the database.
     Query params: page - results page number (default 1), 
     limit - maximum number of entries per page (defaul 20).
+    cursor - keyset pagination, pass an empty one for the first page and 'next' value
+    of the previous response for the following ones; response then contains 'results',
+    'next' and total 'count'.
     """
     # hardcoded query limit for safety purposes, raises 413: 'Payload Too Large'
     if limit > 100:
         raise HTTPException(status_code=413)
 
+    # empty or negative pages
+    if limit < 1 or page < 1:
+        raise HTTPException(status_code=400)
+
     # wrong realm name handling
     if realm_name not in ItemReadHandler.REALM_LIST_EU.values():
         raise HTTPException(status_code=404)
 
     # spawn new handler instance, collect all entries based on given pagination parameters
-    a = AuctionReadHandler(
-        realm_name=     realm_name,
-        faction_sign=   faction_sign,
-        item_slug=      wow_item_slug,
-        page=           page,
-        limit=          limit
-    )
-    return a.response
+    try:
+        a = await run_in_threadpool(
+            AuctionReadHandler,
+            realm_name=     realm_name,
+            faction_sign=   faction_sign,
+            item_slug=      wow_item_slug,
+            page=           page,
+            limit=          limit,
+            page_cursor=    cursor
+        )
+
+    # malformed cursor
+    except ValueError:
+        raise HTTPException(status_code=400)
+
+    return FastJSONResponse(a.rendered)
 
 
 @app.get("/item_search/{wow_item_slug}/")
@@ -81,10 +340,15 @@ async def response_item_search(wow_item_slug: str, page: int = 1, limit: int = 2
     if limit > 100:
         raise HTTPException(status_code=413)
 
+    # empty or negative pages
+    if limit < 1 or page < 1:
+        raise HTTPException(status_code=400)
+
     # spawn new handler instance, collect all entries
-    i = ItemSearchHandler(
+    i = await run_in_threadpool(
+        ItemSearchHandler,
         item_slug=      wow_item_slug,
         page=           page,
         limit=          limit
     )
-    return i.response
\ No newline at end of file
+    return FastJSONResponse(i.rendered)
\ No newline at end of file
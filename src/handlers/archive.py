@@ -0,0 +1,169 @@
+"""
+AuctioNation2 columnar snapshot archive resources.
+"""
+
+import os
+import shutil
+
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+
+class SnapshotArchive:
+    """
+    Columnar on-disk archive of auction snapshots, independent of the database.
+
+    Every realm/faction snapshot is a directory of typed NumPy arrays, one file per column:
+        {root}/{realm_name}/{faction_sign}/{YYYYmmddHHMMSS}/{column}.npy
+    which are memory-mapped on read, so scans over months of history are zero-copy.
+    Compressed snapshots are a single 'columns.npz' file instead, loaded into memory on read.
+
+    Written snapshots stay pending (hidden) until commit(), called once they got published
+    in the database, or discard(), so the archive never holds snapshots the database has not.
+    """
+    # column -> (dtype, array typecode used while collecting rows)
+    COLUMNS: Dict[str, Tuple[type, str]] = {
+        'wow_id':       (np.int64, 'q'),
+        'wow_item_id':  (np.int32, 'i'),
+        'buyout':       (np.int64, 'q'),
+        'quantity':     (np.int32, 'i'),
+        'time_left':    (np.int8,  'b')
+    }
+
+    TIME_FORMAT: str = '%Y%m%d%H%M%S'
+
+    def __init__(self, root: str, compress: bool = False):
+        self.root = Path(root)
+        self.compress = compress
+
+    def __repr__(self) -> str:
+        return f'SnapshotArchive({str(self.root)!r}, {self.compress})'
+
+    def _path(self, realm_name: str, faction_sign: str, snapshot_time: datetime) -> Path:
+        return self.root / realm_name / faction_sign / snapshot_time.strftime(self.TIME_FORMAT)
+
+    @staticmethod
+    def _pending_path(path: Path) -> Path:
+        return path.with_name(f'.{path.name}.pending')
+
+    def writer(self, realm_name: str, faction_sign: str, snapshot_time: datetime) -> 'SnapshotArchiveWriter':
+        path = self._path(realm_name, faction_sign, snapshot_time)
+        return SnapshotArchiveWriter(self, self._pending_path(path))
+
+    def commit(self, realm_name: str, faction_sign: str, snapshot_time: datetime) -> bool:
+        """
+        Moves pending snapshot into place, returns False if there is none.
+        """
+        path = self._path(realm_name, faction_sign, snapshot_time)
+        pending = self._pending_path(path)
+
+        if not pending.is_dir():
+            return False
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(pending, path)
+
+        return True
+
+    def discard(self, realm_name: str, faction_sign: str, snapshot_time: datetime) -> None:
+        shutil.rmtree(
+            self._pending_path(self._path(realm_name, faction_sign, snapshot_time)),
+            ignore_errors=True
+        )
+
+    def snapshots(self, realm_name: str, faction_sign: str) -> List[datetime]:
+        """
+        Returns times of all the archived snapshots, oldest first.
+        """
+        path = self.root / realm_name / faction_sign
+
+        if not path.is_dir():
+            return []
+
+        return sorted(
+            datetime.strptime(entry.name, self.TIME_FORMAT)
+            for entry in path.iterdir()
+            if entry.is_dir() and not entry.name.startswith('.')
+        )
+
+    def read(self, realm_name: str, faction_sign: str, snapshot_time: datetime) -> Dict[str, np.ndarray]:
+        """
+        Returns snapshot columns, memory-mapped unless the snapshot is compressed.
+        """
+        path = self._path(realm_name, faction_sign, snapshot_time)
+
+        if (path / 'columns.npz').exists():
+            with np.load(path / 'columns.npz') as data:
+                return {column: data[column] for column in self.COLUMNS}
+
+        return {column: np.load(path / f'{column}.npy', mmap_mode='r') for column in self.COLUMNS}
+
+    def scan(self, realm_name: str, faction_sign: str) -> Iterator[Tuple[datetime, Dict[str, np.ndarray]]]:
+        for snapshot_time in self.snapshots(realm_name, faction_sign):
+            yield snapshot_time, self.read(realm_name, faction_sign, snapshot_time)
+
+    def item_history(self, realm_name: str, faction_sign: str, wow_item_id: int) -> tuple:
+        """
+        Returns columnar history of a single item: api_request_time, buyout and quantity arrays,
+        ready for StatsCalculator.get_all().
+        """
+        times, buyouts, quantities = [], [], []
+
+        for snapshot_time, columns in self.scan(realm_name, faction_sign):
+            mask = columns['wow_item_id'] == wow_item_id
+
+            buyouts.append(columns['buyout'][mask])
+            quantities.append(columns['quantity'][mask])
+            times.append(np.full(len(buyouts[-1]), np.datetime64(snapshot_time, 's')))
+
+        if not times:
+            return np.array([], dtype='datetime64[s]'), np.array([], dtype=np.int64), np.array([], dtype=np.int32)
+
+        return np.concatenate(times), np.concatenate(buyouts), np.concatenate(quantities)
+
+
+class SnapshotArchiveWriter:
+    """
+    Collects single snapshot columns into compact typed buffers and saves them as a pending
+    snapshot on close(), atomically, so readers never see a half-written snapshot.
+    """
+    def __init__(self, archive: SnapshotArchive, path: Path):
+        self._archive = archive
+        self._path = path
+        self._buffers: Dict[str, array] = {
+            column: array(typecode) for column, (_, typecode) in archive.COLUMNS.items()
+        }
+
+    def __repr__(self) -> str:
+        return f'SnapshotArchiveWriter({str(self._path)!r})'
+
+    def extend(self, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Appends whole columns at once, as produced by AuctionColumnExtractor.
+        """
+        for column, (dtype, _) in self._archive.COLUMNS.items():
+            self._buffers[column].frombytes(np.ascontiguousarray(columns[column], dtype=dtype).tobytes())
+
+    def close(self) -> None:
+        columns = {
+            column: np.frombuffer(self._buffers[column], dtype=dtype)
+            for column, (dtype, _) in self._archive.COLUMNS.items()
+        }
+
+        # written next to the target, then renamed into place
+        temporary = self._path.with_name(f'.{self._path.name}.{os.getpid()}')
+        shutil.rmtree(temporary, ignore_errors=True)
+        temporary.mkdir(parents=True)
+
+        if self._archive.compress:
+            np.savez_compressed(temporary / 'columns.npz', **columns)
+        else:
+            for column, values in columns.items():
+                np.save(temporary / f'{column}.npy', values)
+
+        shutil.rmtree(self._path, ignore_errors=True)
+        os.rename(temporary, self._path)
@@ -0,0 +1,103 @@
+"""
+Asynchronous Blizzard API connection resources.
+"""
+
+import asyncio
+import time
+
+from typing import Dict, Optional
+
+import aiohttp
+
+from .connection import BlizzApi
+from .exceptions import BlizzApiError, TimeoutError
+from .local_settings import CLIENT_ID, CLIENT_SECRET
+
+
+class AsyncBlizzApi:
+    """
+    Pooled asyncio BlizzAPI client.
+
+    Shares OAuth token cache with BlizzApi, reuses keep-alive connections, caps number
+    of requests in flight and makes conditional requests, so unchanged resources are skipped.
+    Use as an async context manager.
+    """
+    def __init__(self, concurrency: int = 8, timeout: float = 10,
+                 token_url: Optional[str] = None,
+                 last_modified: Optional[Dict[str, str]] = None):
+        self.token_url = token_url or BlizzApi.TOKEN_URL
+        self.timeout = timeout
+
+        # url -> 'Last-Modified' header of its last stored response, requests are conditional on it;
+        # headers of responses fetched by this client are kept apart, until the caller stores them
+        self.last_modified: Dict[str, str] = last_modified if last_modified is not None else {}
+        self.modified: Dict[str, str] = {}
+
+        self._concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._token_lock = asyncio.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def __repr__(self) -> str:
+        return f'AsyncBlizzApi({self._concurrency})'
+
+    async def __aenter__(self) -> 'AsyncBlizzApi':
+        self._session = aiohttp.ClientSession(
+            connector=  aiohttp.TCPConnector(limit=self._concurrency),
+            timeout=    aiohttp.ClientTimeout(sock_connect=self.timeout, sock_read=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._session.close()
+
+    async def get_token(self) -> str:
+        """
+        Returns Blizzard OAuth token, requesting a new one only when the cached one expires.
+        """
+        async with self._token_lock:
+            if BlizzApi._token and time.time() < BlizzApi._token_expires:
+                return BlizzApi._token
+
+            async with self._session.post(
+                self.token_url,
+                auth=aiohttp.BasicAuth(CLIENT_ID, CLIENT_SECRET),
+                params={'grant_type': 'client_credentials'}
+            ) as response:
+                BlizzApi.set_token(await response.json(content_type=None))
+
+            return BlizzApi._token
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """
+        Returns raw response body, or None in case resource has not changed since last fetch.
+        Raises TimeoutError if connection hangs for too long, BlizzApiError on error statuses
+        and connection failures (reset, DNS failure, server disconnect), both of which are retried.
+        """
+        headers: Dict[str, str] = {}
+        if url in self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified[url]
+
+        try:
+            token = await self.get_token()
+
+            async with self._semaphore:
+                async with self._session.get(url + token, headers=headers) as response:
+                    if response.status == 304:
+                        return None
+
+                    if response.status >= 400:
+                        raise BlizzApiError(response.status)
+
+                    body = await response.read()
+
+        except asyncio.TimeoutError:
+            raise TimeoutError
+
+        except aiohttp.ClientError as e:
+            raise BlizzApiError(repr(e)) from e
+
+        if response.headers.get('Last-Modified'):
+            self.modified[url] = response.headers['Last-Modified']
+
+        return body
@@ -7,28 +7,48 @@ from requests.auth import HTTPBasicAuth
 from requests.exceptions import Timeout
 
 import json
+import os
+import threading
+import time
 import psycopg2
 
+from psycopg2.pool import ThreadedConnectionPool
+
 from .local_settings import CLIENT_ID, CLIENT_SECRET, USER, PASSWORD
+from .metrics import POOL_WAIT_SECONDS
+from .tracing import TracingCursor, query_tracer
 
 
 class BlizzApi:
+    TOKEN_URL = 'https://us.battle.net/oauth/token'
+
+    # token is shared by all the instances (and forked processes) until it expires
+    TOKEN_EXPIRY_MARGIN = 300
+    _token = None
+    _token_expires = 0.0
+
+    # keep-alive HTTP session, one per process
+    _session = None
+    _session_pid = None
 
     def __init__(self, url):
         self.url = url
         self.timeout = False
         self.response = None
         self.token = self.get_token()
-    
-    @staticmethod
-    def get_token():
+
+    @classmethod
+    def get_token(cls):
         """
-        Returns Blizzard OAuth token.
+        Returns Blizzard OAuth token, requesting a new one only when the cached one expires.
 
         Requires Blizzard API client pre-setup and already generated client ID, Secret.
         """
-        access_response = requests.post(
-            'https://us.battle.net/oauth/token',
+        if cls._token and time.time() < cls._token_expires:
+            return cls._token
+
+        access_response = cls.get_session().post(
+            cls.TOKEN_URL,
             auth=HTTPBasicAuth(
                 CLIENT_ID,
                 CLIENT_SECRET
@@ -38,18 +58,39 @@ class BlizzApi:
             }
         )
 
-        token = json.loads(access_response.content).get('access_token')
+        cls.set_token(json.loads(access_response.content))
+
+        return cls._token
+
+    @classmethod
+    def set_token(cls, token_data: dict):
+        """
+        Caches token from Blizzard OAuth response data.
+        """
+        BlizzApi._token = token_data.get('access_token')
+        BlizzApi._token_expires = time.time() + token_data.get('expires_in', 0) - cls.TOKEN_EXPIRY_MARGIN
+
+    @classmethod
+    def get_session(cls):
+        """
+        Returns pooled requests session, a fresh one in each new process.
+        """
+        if BlizzApi._session is None or BlizzApi._session_pid != os.getpid():
+            BlizzApi._session = requests.Session()
+            BlizzApi._session_pid = os.getpid()
 
-        return token
+        return BlizzApi._session
 
-    def get_response(self):
+    def get_response(self, stream: bool = False):
         """
         Makes an attempt to connect Blizzard API, fails in case connection hangs for too long.
+        With stream set, response body is left unread to be consumed in chunks.
         """
         try:
-            result = requests.get(
+            result = self.get_session().get(
                 self.url + self.token,
-                timeout=10
+                timeout=10,
+                stream=stream
             )
             self.response = result
             self.timeout = False
@@ -59,22 +100,100 @@ class BlizzApi:
             self.timeout = True
 
 
+class PreparingConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection remembering statements prepared within its database session.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
 class DatabaseConnection:
+    PARAMS = {
+        'database': 'auctionation2_test',
+        'user':     USER,
+        'password': PASSWORD,
+        'host':     '127.0.0.1',
+        'port':     '5432'
+    }
 
     def __init__(self):
         self.connection = self.get_connection()
+
+    @classmethod
+    def connect_params(cls) -> dict:
+        """
+        Returns psycopg2.connect() arguments, queries are traced if query_tracer is enabled.
+        """
+        params = dict(cls.PARAMS, connection_factory=PreparingConnection)
+
+        if query_tracer.enabled:
+            params['cursor_factory'] = TracingCursor
+
+        return params
     
     def get_connection(self):
         try:
-            result = psycopg2.connect(
-                database='auctionation2_test',
-                user=USER,
-                password=PASSWORD,
-                host='127.0.0.1',
-                port='5432'
-            )
+            result = psycopg2.connect(**self.connect_params())
 
             return result
 
         except psycopg2.OperationalError:
             return None
+
+
+class PooledDatabaseConnection(DatabaseConnection):
+    """
+    Borrows connection from the shared pool instead of opening a new one,
+    falls back to a fresh connection while the pool is not initialized.
+    Connection has to be given back with release().
+    """
+    pool = None
+
+    # blocks borrowers while all the pooled connections are in use
+    _available = None
+
+    def __init__(self):
+        self._pooled = PooledDatabaseConnection.pool is not None
+        super().__init__()
+
+    @classmethod
+    def init_pool(cls, minconn: int = 2, maxconn: int = 20):
+        PooledDatabaseConnection.pool = ThreadedConnectionPool(minconn, maxconn, **cls.connect_params())
+        PooledDatabaseConnection._available = threading.BoundedSemaphore(maxconn)
+
+    @classmethod
+    def close_pool(cls):
+        if PooledDatabaseConnection.pool is not None:
+            PooledDatabaseConnection.pool.closeall()
+            PooledDatabaseConnection.pool = None
+
+    def get_connection(self):
+        if not self._pooled:
+            return super().get_connection()
+
+        with POOL_WAIT_SECONDS.time():
+            self._available.acquire()
+
+        try:
+            return self.pool.getconn()
+
+        except psycopg2.Error:
+            self._available.release()
+            return None
+
+    def release(self):
+        """
+        Gives the connection back to the pool (or closes it, if not pooled).
+        """
+        if self.connection is None:
+            return
+
+        if self._pooled:
+            self.pool.putconn(self.connection)
+            self._available.release()
+        else:
+            self.connection.close()
+
+        self.connection = None
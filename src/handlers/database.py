@@ -5,22 +5,31 @@ AuctioNation2 main database handling resources.
 # --------
 # IMPORTS |
 # --------
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from pathlib import Path
 from abc import ABC, abstractmethod
-from typing import Dict, List
-
-from .connection import BlizzApi, DatabaseConnection
-from .exceptions import TimeoutError
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .archive import SnapshotArchive, SnapshotArchiveWriter
+from .connection import BlizzApi, DatabaseConnection, PooledDatabaseConnection
+from .exceptions import BlizzApiError, TimeoutError
+from .ingest import AuctionColumnExtractor, IteratorFile
+from .metrics import ROWS_INGESTED, span, timed
+from .read_cache import auction_cache, count_cache, item_cache
+from .search import search_index
+from .serialization import RenderedResponseMixin
+from .snapshot import SnapshotClock
+from .stats import StatsCalculator
 from . import multiprocess_manager
-from .local_settings import USER, PASSWORD
 
+import base64
+import binascii
 import json
 import csv
 import os
-import psycopg2
 
 import numpy as np
+import psycopg2
 
 # --------
 # CLASSES |
@@ -91,21 +100,217 @@ class QueryMixin:
         'h': 6
     }
 
+    TIME_LEFT: Dict[str, int] = {
+        'SHORT':        1,
+        'MEDIUM':       2,
+        'LONG':         3,
+        'VERY_LONG':    4
+    }
+
+    # all the auction data of a realm, aggregates of it included, so no reader serves stats of deleted auctions
     DELETE_AUCTION_DATA: str = """--sql
-        DELETE FROM realm_{0}
+        DELETE FROM realm_{0};
+        DELETE FROM live_{0};
+        DELETE FROM auction_intervals_{0};
+        DELETE FROM item_stats_{0};
+        DELETE FROM item_rollup_{0};
     """
 
+    # realm tables are partitioned by day, partitions are created by PartitionMixin
     CREATE_REALMS: str = """--sql
-        CREATE TABLE realm_%s(
-            id SERIAL PRIMARY KEY,
+        CREATE TABLE realm_{0}(
+            id SERIAL,
             faction VARCHAR(1),
             wow_id BIGINT,
             wow_item_id INT,
             buyout INT,
             quantity INT,
             api_request_time TIMESTAMP,
-            time_left SMALLINT
+            time_left SMALLINT,
+            PRIMARY KEY (id, api_request_time)
+        )
+        PARTITION BY RANGE (api_request_time);
+
+        CREATE INDEX realm_{0}_item_idx ON realm_{0} (faction, wow_item_id, api_request_time);
+        CREATE INDEX realm_{0}_time_idx ON realm_{0} (api_request_time, faction);
+    """
+
+    # current snapshot only, what live auction listings are read from, whatever the history length;
+    # replaced by write sessions row by row, spare page room keeps the updates HOT
+    CREATE_LIVE_AUCTIONS: str = """--sql
+        CREATE TABLE IF NOT EXISTS live_{0}(
+            faction VARCHAR(1),
+            wow_id BIGINT,
+            wow_item_id INT,
+            buyout INT,
+            quantity INT,
+            api_request_time TIMESTAMP,
+            time_left SMALLINT,
+            PRIMARY KEY (faction, wow_id)
+        )
+        WITH (fillfactor = 70);
+
+        CREATE INDEX IF NOT EXISTS live_{0}_item_idx
+        ON live_{0} (faction, wow_item_id, wow_id) INCLUDE (buyout, quantity);
+    """
+
+    # auctions keep their ids (and buyouts) between snapshots, so mostly only time_left changes and only
+    # changed rows are rewritten, api_request_time being the snapshot of the last change; auctions missing
+    # from the staged snapshot (anti-join) are gone. Auction houses left out of a session keep their previous snapshot
+    REPLACE_LIVE_AUCTIONS: str = """--sql
+        INSERT INTO live_{0} AS live(
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            api_request_time,
+            time_left
+        )
+        SELECT DISTINCT ON (wow_id)
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            api_request_time,
+            time_left
+        FROM {1}
+        ON CONFLICT (faction, wow_id) DO UPDATE SET
+            api_request_time = EXCLUDED.api_request_time,
+            time_left = EXCLUDED.time_left
+        WHERE live.time_left IS DISTINCT FROM EXCLUDED.time_left;
+
+        DELETE FROM live_{0} AS live
+        WHERE
+            faction = %(faction)s
+            AND NOT EXISTS (
+                SELECT 1
+                FROM {1} AS incoming
+                WHERE incoming.wow_id = live.wow_id
+            );
+    """
+
+    # empty current snapshot table filled with the latest published snapshot, e.g. right after deployment,
+    # from realm table or, if delta mode wrote it, from auction intervals still open
+    SEED_LIVE_AUCTIONS: str = """--sql
+        WITH latest AS (
+            SELECT api_request_time
+            FROM api_request_time_record
+            ORDER BY id DESC
+            LIMIT 1
+        )
+        INSERT INTO live_{0}(
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            api_request_time,
+            time_left
+        )
+        SELECT
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            api_request_time,
+            time_left
+        FROM realm_{0}
+        WHERE
+            api_request_time = (SELECT api_request_time FROM latest)
+            AND NOT EXISTS (SELECT 1 FROM live_{0})
+        UNION ALL
+        SELECT
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            last_seen,
+            time_left
+        FROM auction_intervals_{0}
+        WHERE
+            closed IS NULL
+            AND NOT EXISTS (SELECT 1 FROM realm_{0} WHERE api_request_time = (SELECT api_request_time FROM latest))
+            AND NOT EXISTS (SELECT 1 FROM live_{0})
+        ON CONFLICT DO NOTHING
+    """
+
+    CREATE_REALM_PARTITION: str = """--sql
+        CREATE TABLE IF NOT EXISTS realm_{0}_{1}
+        PARTITION OF realm_{0}
+        FOR VALUES FROM ('{2}') TO ('{3}')
+    """
+
+    READ_TABLE_KIND: str = """--sql
+        SELECT relkind FROM pg_class WHERE relname='realm_{0}'
+    """
+
+    # moves not partitioned table (and its sequence, primary key) out of the way
+    RENAME_LEGACY_REALM: str = """--sql
+        ALTER TABLE realm_{0} RENAME TO realm_{0}_legacy;
+        ALTER INDEX realm_{0}_pkey RENAME TO realm_{0}_legacy_pkey;
+        ALTER SEQUENCE realm_{0}_id_seq RENAME TO realm_{0}_legacy_id_seq;
+    """
+
+    READ_LEGACY_DAYS: str = """--sql
+        SELECT DISTINCT date_trunc('day', api_request_time)::date
+        FROM realm_{0}_legacy
+        WHERE api_request_time IS NOT NULL
+    """
+
+    MIGRATE_LEGACY_REALM: str = """--sql
+        INSERT INTO realm_{0}(
+            id,
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            api_request_time,
+            time_left
+        )
+        SELECT
+            id,
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            api_request_time,
+            time_left
+        FROM realm_{0}_legacy
+        WHERE api_request_time IS NOT NULL;
+
+        SELECT setval('realm_{0}_id_seq', COALESCE((SELECT MAX(id) FROM realm_{0}), 1));
+
+        DROP TABLE realm_{0}_legacy;
+    """
+
+    # per-snapshot item price statistics, aggregated at write time
+    CREATE_ITEM_STATS: str = """--sql
+        CREATE TABLE IF NOT EXISTS item_stats_{0}(
+            faction VARCHAR(1),
+            wow_item_id INT,
+            api_request_time TIMESTAMP,
+            lowest DOUBLE PRECISION,
+            mean DOUBLE PRECISION,
+            median DOUBLE PRECISION,
+            percentile_25 DOUBLE PRECISION,
+            percentile_75 DOUBLE PRECISION,
+            count INT,
+            quantity BIGINT,
+            weighted_mean DOUBLE PRECISION,
+            weighted_median DOUBLE PRECISION,
+            PRIMARY KEY (faction, wow_item_id, api_request_time)
         );
+
+        -- tables created before quantity-weighted stats were aggregated, their older rows stay NULL
+        ALTER TABLE item_stats_{0}
+            ADD COLUMN IF NOT EXISTS weighted_mean DOUBLE PRECISION,
+            ADD COLUMN IF NOT EXISTS weighted_median DOUBLE PRECISION;
     """
 
     CREATE_ITEM_TABLEL: str = """--sql
@@ -137,8 +342,27 @@ class QueryMixin:
         )
     """
 
+    NOTIFY_SNAPSHOT: str = """--sql
+        NOTIFY snapshot_published
+    """
+
+    # write sessions share staging tables, so they never overlap: one running past the hour
+    # is waited for; held by the session's own connection, released along with it if it dies
+    LOCK_WRITE_SESSION: str = """--sql
+        SELECT pg_advisory_lock(hashtext('auctionation_write_session'))
+    """
+
+    UNLOCK_WRITE_SESSION: str = """--sql
+        SELECT pg_advisory_unlock(hashtext('auctionation_write_session'))
+    """
+
+    NOTIFY_ITEM_DATA: str = """--sql
+        NOTIFY item_data_changed
+    """
+
+    # into staging table, see CREATE_STAGING_AUCTIONS
     BULK_CREATE_AUCTIONS: str = """--sql
-        COPY realm_%s(
+        COPY %s(
             faction,
             wow_id,
             wow_item_id,
@@ -152,6 +376,145 @@ class QueryMixin:
         CSV HEADER;
     """
 
+    # into realm table or a table of the same layout
+    STREAM_CREATE_AUCTIONS: str = """--sql
+        COPY %s(
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            api_request_time,
+            time_left
+        )
+        FROM STDIN
+        WITH (FORMAT csv);
+    """
+
+    # delta mode: each auction stored once, as an interval of snapshots it was listed in;
+    # closed is the first snapshot it was missing from, outcome 's' (probably sold) or 'e' (expired)
+    CREATE_AUCTION_INTERVALS: str = """--sql
+        CREATE TABLE IF NOT EXISTS auction_intervals_{0}(
+            faction VARCHAR(1),
+            wow_id BIGINT,
+            wow_item_id INT,
+            buyout INT,
+            quantity INT,
+            time_left SMALLINT,
+            first_seen TIMESTAMP,
+            last_seen TIMESTAMP,
+            closed TIMESTAMP DEFAULT NULL,
+            outcome VARCHAR(1) DEFAULT NULL,
+            PRIMARY KEY (faction, wow_id)
+        )
+        WITH (fillfactor = 70);
+
+        CREATE INDEX IF NOT EXISTS auction_intervals_{0}_open_idx
+        ON auction_intervals_{0} (faction, wow_id) WHERE closed IS NULL;
+
+        CREATE INDEX IF NOT EXISTS auction_intervals_{0}_item_idx
+        ON auction_intervals_{0} (faction, wow_item_id, first_seen);
+    """
+
+    # write sessions COPY every auction house into its own staging table first,
+    # nothing there is visible to readers until RealmWriteHandler.publish(); unlogged, as it is disposable
+    CREATE_STAGING_AUCTIONS: str = """--sql
+        CREATE UNLOGGED TABLE IF NOT EXISTS {0}(
+            faction VARCHAR(1),
+            wow_id BIGINT,
+            wow_item_id INT,
+            buyout INT,
+            quantity INT,
+            api_request_time TIMESTAMP,
+            time_left SMALLINT
+        );
+
+        TRUNCATE {0};
+    """
+
+    ANALYZE_STAGING_AUCTIONS: str = """--sql
+        ANALYZE {0}
+    """
+
+    TRUNCATE_STAGING_AUCTIONS: str = """--sql
+        TRUNCATE {0}
+    """
+
+    PUBLISH_AUCTIONS: str = """--sql
+        INSERT INTO realm_{0}(
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            api_request_time,
+            time_left
+        )
+        SELECT
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            api_request_time,
+            time_left
+        FROM {1}
+    """
+
+    # extends still listed auctions up to the staged snapshot of their own auction house, opens new ones;
+    # CLOSE_AUCTION_INTERVALS then closes the ones gone. Neither last_seen nor time_left is indexed,
+    # so extending an interval is a HOT update within its page
+    APPLY_AUCTION_DELTA: str = """--sql
+        UPDATE auction_intervals_{0} AS intervals
+        SET
+            last_seen = incoming.api_request_time,
+            time_left = incoming.time_left
+        FROM {1} AS incoming
+        WHERE
+            intervals.faction = incoming.faction
+            AND intervals.wow_id = incoming.wow_id
+            AND intervals.closed IS NULL;
+
+        INSERT INTO auction_intervals_{0}(
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            time_left,
+            first_seen,
+            last_seen
+        )
+        SELECT
+            faction,
+            wow_id,
+            wow_item_id,
+            buyout,
+            quantity,
+            time_left,
+            api_request_time,
+            api_request_time
+        FROM {1}
+        ON CONFLICT (faction, wow_id) DO NOTHING;
+    """
+
+    # open auctions missing from the staged snapshot (anti-join) are gone since the snapshot
+    # they were last seen in; auction gone while it still had more than SHORT time left was most likely sold
+    CLOSE_AUCTION_INTERVALS: str = """--sql
+        UPDATE auction_intervals_{0} AS intervals
+        SET
+            closed = %(time)s,
+            outcome = CASE WHEN intervals.time_left > 1 THEN 's' ELSE 'e' END
+        WHERE
+            intervals.faction = %(faction)s
+            AND intervals.closed IS NULL
+            AND NOT EXISTS (
+                SELECT 1
+                FROM {1} AS incoming
+                WHERE incoming.wow_id = intervals.wow_id
+            )
+    """
+
     POPULATE_ITEM_DATA: str = """--sql
         COPY item_data(
             wow_item_id,
@@ -168,109 +531,444 @@ class QueryMixin:
         CSV HEADER;
     """
 
+    # one grouped pass over a single snapshot (or whole history if filters are always true),
+    # read from realm table or a table of the same layout, prices are per item unit;
+    # weighted median is the lowest unit price at which half of all the listed units could be bought
+    AGGREGATE_ITEM_STATS: str = """--sql
+        WITH priced AS (
+            SELECT
+                faction,
+                wow_item_id,
+                api_request_time,
+                buyout,
+                quantity,
+                buyout::float8 / quantity AS unit_price,
+                SUM(quantity) OVER (
+                    PARTITION BY faction, wow_item_id, api_request_time
+                    ORDER BY buyout::float8 / quantity
+                    ROWS UNBOUNDED PRECEDING
+                ) AS cumulative,
+                SUM(quantity) OVER (PARTITION BY faction, wow_item_id, api_request_time) AS total
+            FROM {2}
+            WHERE {1}
+        )
+        INSERT INTO item_stats_{0}(
+            faction,
+            wow_item_id,
+            api_request_time,
+            lowest,
+            mean,
+            median,
+            percentile_25,
+            percentile_75,
+            count,
+            quantity,
+            weighted_mean,
+            weighted_median
+        )
+        SELECT
+            faction,
+            wow_item_id,
+            api_request_time,
+            MIN(unit_price),
+            AVG(unit_price),
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY unit_price),
+            percentile_cont(0.25) WITHIN GROUP (ORDER BY unit_price),
+            percentile_cont(0.75) WITHIN GROUP (ORDER BY unit_price),
+            COUNT(*),
+            SUM(quantity),
+            SUM(buyout)::float8 / SUM(quantity),
+            MIN(unit_price) FILTER (WHERE cumulative >= total / 2.0)
+        FROM priced
+        GROUP BY faction, wow_item_id, api_request_time
+        ON CONFLICT DO NOTHING
+    """
+
+    # compacted (daily, weekly) history first (no percentiles nor weighted stats), then per-snapshot stats,
+    # columns in StatsCalculator.KEYS order; rollup averages are rounded to item_stats integer types,
+    # so counts never turn into floats; prepared statement, $1: faction, $2: wow_item_id
+    READ_ITEM_STATS: str = """--sql
+        SELECT
+            period_start,
+            lowest,
+            mean,
+            median,
+            ROUND(count)::int,
+            ROUND(quantity)::bigint,
+            NULL,
+            NULL,
+            NULL,
+            NULL
+        FROM item_rollup_{0}
+        WHERE faction=$1 AND wow_item_id=$2
+        UNION ALL
+        SELECT
+            api_request_time,
+            lowest,
+            mean,
+            median,
+            count,
+            quantity,
+            percentile_25,
+            percentile_75,
+            weighted_mean,
+            weighted_median
+        FROM item_stats_{0}
+        WHERE faction=$1 AND wow_item_id=$2
+        ORDER BY 1
+    """
+
+    # downsampled item stats, 'd' (daily) or 'w' (weekly) periods,
+    # count and quantity are averages per snapshot, so they stay comparable with item_stats
+    CREATE_ITEM_ROLLUP: str = """--sql
+        CREATE TABLE IF NOT EXISTS item_rollup_{0}(
+            faction VARCHAR(1),
+            wow_item_id INT,
+            period VARCHAR(1),
+            period_start TIMESTAMP,
+            lowest DOUBLE PRECISION,
+            mean DOUBLE PRECISION,
+            median DOUBLE PRECISION,
+            count DOUBLE PRECISION,
+            quantity DOUBLE PRECISION,
+            snapshots INT,
+            PRIMARY KEY (faction, wow_item_id, period, period_start)
+        );
+    """
+
+    READ_REALM_PARTITIONS: str = """--sql
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'realm_{0}'::regclass
+    """
+
+    READ_REALM_SIZE: str = """--sql
+        SELECT
+            COALESCE(
+                (SELECT SUM(pg_total_relation_size(inhrelid))
+                 FROM pg_inherits
+                 WHERE inhparent = 'realm_{0}'::regclass),
+                0
+            )
+            + pg_total_relation_size('item_stats_{0}')
+            + pg_total_relation_size('item_rollup_{0}')
+    """
+
+    # exact daily stats from a raw partition, replacing its per-snapshot stats;
+    # items with no raw rows that day (delta mode sessions leave partitions empty) are rolled up
+    # from their per-snapshot stats instead, median approximated as in ROLLUP_WEEKLY
+    ROLLUP_DAILY: str = """--sql
+        INSERT INTO item_rollup_{0}(
+            faction,
+            wow_item_id,
+            period,
+            period_start,
+            lowest,
+            mean,
+            median,
+            count,
+            quantity,
+            snapshots
+        )
+        SELECT
+            faction,
+            wow_item_id,
+            'd',
+            '{2}',
+            MIN(buyout::float8 / quantity),
+            AVG(buyout::float8 / quantity),
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY buyout::float8 / quantity),
+            COUNT(*)::float8 / COUNT(DISTINCT api_request_time),
+            SUM(quantity)::float8 / COUNT(DISTINCT api_request_time),
+            COUNT(DISTINCT api_request_time)
+        FROM {1}
+        GROUP BY faction, wow_item_id
+        ON CONFLICT DO NOTHING;
+
+        INSERT INTO item_rollup_{0}(
+            faction,
+            wow_item_id,
+            period,
+            period_start,
+            lowest,
+            mean,
+            median,
+            count,
+            quantity,
+            snapshots
+        )
+        SELECT
+            faction,
+            wow_item_id,
+            'd',
+            '{2}',
+            MIN(lowest),
+            SUM(mean * count) / SUM(count),
+            SUM(median * count) / SUM(count),
+            AVG(count),
+            AVG(quantity),
+            COUNT(*)
+        FROM item_stats_{0}
+        WHERE api_request_time >= '{2}' AND api_request_time < '{3}'
+        GROUP BY faction, wow_item_id
+        ON CONFLICT DO NOTHING;
+
+        DELETE FROM item_stats_{0}
+        WHERE api_request_time >= '{2}' AND api_request_time < '{3}';
+
+        DROP TABLE {1};
+    """
+
+    # weekly stats from complete weeks of daily stats, median is approximated
+    # by count-weighted mean of daily medians
+    ROLLUP_WEEKLY: str = """--sql
+        INSERT INTO item_rollup_{0}(
+            faction,
+            wow_item_id,
+            period,
+            period_start,
+            lowest,
+            mean,
+            median,
+            count,
+            quantity,
+            snapshots
+        )
+        SELECT
+            faction,
+            wow_item_id,
+            'w',
+            date_trunc('week', period_start),
+            MIN(lowest),
+            SUM(mean * count * snapshots) / SUM(count * snapshots),
+            SUM(median * count * snapshots) / SUM(count * snapshots),
+            SUM(count * snapshots) / SUM(snapshots),
+            SUM(quantity * snapshots) / SUM(snapshots),
+            SUM(snapshots)
+        FROM item_rollup_{0}
+        WHERE period = 'd' AND period_start < date_trunc('week', '{1}'::timestamp)
+        GROUP BY faction, wow_item_id, date_trunc('week', period_start)
+        ON CONFLICT DO NOTHING;
+
+        DELETE FROM item_rollup_{0}
+        WHERE period = 'd' AND period_start < date_trunc('week', '{1}'::timestamp);
+    """
+
+    # READ_ITEM_STATS counterpart for many items at once
+    READ_ITEMS_STATS: str = """--sql
+        SELECT
+            wow_item_id,
+            period_start,
+            lowest,
+            mean,
+            median,
+            ROUND(count)::int,
+            ROUND(quantity)::bigint,
+            NULL,
+            NULL,
+            NULL,
+            NULL
+        FROM item_rollup_{0}
+        WHERE faction=%(faction)s AND wow_item_id = ANY(%(wow_item_ids)s)
+        UNION ALL
+        SELECT
+            wow_item_id,
+            api_request_time,
+            lowest,
+            mean,
+            median,
+            count,
+            quantity,
+            percentile_25,
+            percentile_75,
+            weighted_mean,
+            weighted_median
+        FROM item_stats_{0}
+        WHERE faction=%(faction)s AND wow_item_id = ANY(%(wow_item_ids)s)
+        ORDER BY 2
+    """
+
+    READ_ITEMS_DATA: str = """--sql
+        SELECT
+            wow_item_id,
+            buyout,
+            api_request_time,
+            quantity
+        FROM realm_{0}
+        WHERE faction=%(faction)s AND wow_item_id = ANY(%(wow_item_ids)s)
+    """
+
+    # latest per-snapshot stats of a single realm and faction (backward primary key scan),
+    # joined into one UNION ALL query over all the realms by CrossRealmReadHandler
+    READ_LATEST_ITEM_STATS: str = """--sql
+        (
+            SELECT
+                '{0}',
+                faction,
+                api_request_time,
+                lowest,
+                median,
+                count
+            FROM item_stats_{0}
+            WHERE faction='{1}' AND wow_item_id=%(wow_item_id)s
+            ORDER BY api_request_time DESC
+            LIMIT 1
+        )
+    """
+
+    READ_WATCHLIST: str = """--sql
+        SELECT item FROM user_observed_item WHERE "user"=%s
+    """
+
+    # prepared statement, $1: faction, $2: wow_item_id
     READ_ITEM_DATA: str = """--sql
         SELECT 
             buyout, 
             api_request_time, 
             quantity 
-        FROM realm_%s 
-        WHERE faction='%s' AND wow_item_id=%d
+        FROM realm_{0} 
+        WHERE faction=$1 AND wow_item_id=$2
     """
 
+    # prepared statement, $1: LIKE pattern, $2: offset, $3: limit
     READ_ITEM_SEARCH: str = """--sql
         SELECT 
             * 
         FROM item_data 
-        WHERE name_slug LIKE '%{0}%'
-        OFFSET {1} FETCH NEXT {2} ROWS ONLY
+        WHERE name_slug LIKE $1
+        OFFSET $2 LIMIT $3
     """
 
-    # query to read live auctions (that is, most recent data) together with item names,
-    # also contains already half-done pagination
+    # query to read live auctions (current snapshot table) together with item names,
+    # also contains already half-done pagination;
+    # auction reads are prepared statements, {1} is item slug condition on $2,
+    # $1: faction, $3: offset (or last seen wow_id), $4: limit
     READ_AUCTION_DATA: str = """--sql
         SELECT
-            realm_{0}.wow_id, 
-            realm_{0}.wow_item_id,
-            realm_{0}.buyout, 
-            realm_{0}.quantity, 
-            realm_{0}.time_left,
+            live_{0}.wow_id, 
+            live_{0}.wow_item_id,
+            live_{0}.buyout, 
+            live_{0}.quantity, 
+            live_{0}.time_left,
             item_data.name,
             item_data.icon_url
-        FROM realm_{0}
+        FROM live_{0}
         JOIN item_data
-        ON realm_{0}.wow_item_id = item_data.wow_item_id
+        ON live_{0}.wow_item_id = item_data.wow_item_id
         WHERE 
-            faction='{1}' 
-            AND api_request_time=(
-                SELECT api_request_time
-                FROM api_request_time_record
-                WHERE id=(
-                    SELECT MAX(id) 
-                    FROM api_request_time_record
-                )
-            )
-            AND name_slug LIKE '%{2}%'
+            faction=$1 
+            AND {1}
         ORDER BY wow_id
-        OFFSET {3} FETCH NEXT {4} ROWS ONLY
+        OFFSET $3 LIMIT $4
     """
 
-
-class StatsCalculator:
+    # keyset pagination, continues right after the last seen wow_id
+    READ_AUCTION_DATA_AFTER: str = """--sql
+        SELECT
+            live_{0}.wow_id,
+            live_{0}.wow_item_id,
+            live_{0}.buyout,
+            live_{0}.quantity,
+            live_{0}.time_left,
+            item_data.name,
+            item_data.icon_url
+        FROM live_{0}
+        JOIN item_data
+        ON live_{0}.wow_item_id = item_data.wow_item_id
+        WHERE
+            faction=$1
+            AND {1}
+            AND live_{0}.wow_id > $3
+        ORDER BY wow_id
+        LIMIT $4
     """
-    Main static class used for various statistical calculations. 
-    Implemented to provide scalability and abstraction.
+
+    READ_AUCTION_COUNT: str = """--sql
+        SELECT COUNT(*)
+        FROM live_{0}
+        JOIN item_data
+        ON live_{0}.wow_item_id = item_data.wow_item_id
+        WHERE
+            faction=$1
+            AND {1}
     """
-    @staticmethod
-    def get_mean(data: dict) -> dict:
-        """
-        Returns mean price per item unit for all the entries collected by different api_request_time.
-        """
-        result: Dict[str, float] = {}
 
-        for entry in data:
-            prices_list = data.get(entry)
+    # item slug conditions of auction reads
+    SLUG_ITEM_IDS: str = 'live_{0}.wow_item_id = ANY($2)'
+    SLUG_LIKE: str = 'item_data.name_slug LIKE $2'
 
-            result[entry] = np.mean(prices_list)
 
-        return result
+class PreparedQueryMixin(QueryMixin):
+    """
+    Mixin to execute hot read queries as server-side prepared statements.
 
+    Every statement is prepared once per database session (pooled connections live long)
+    and realm table, PostgreSQL then skips parsing and planning, values are bound as parameters.
+    """
     @staticmethod
-    def get_count(data: dict) -> dict:
+    def like_pattern(text: str) -> str:
         """
-        Returns item auctions count for all the entries collected by different api_request_time.
+        Returns LIKE pattern matching the text anywhere, its wildcard characters escaped.
         """
-        result: Dict[str, int] = {}
+        return '%{0}%'.format(text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_'))
 
-        for entry in data:
-            result[entry] = len(data.get(entry))
+    def _execute_prepared(self, cursor, name: str, statement: str, params: tuple) -> None:
+        prepared = cursor.connection.prepared
 
-        return result
+        if name not in prepared:
+            cursor.execute(f'PREPARE {name} AS {statement}')
+            prepared.add(name)
 
-    @staticmethod
-    def get_median(data: dict) -> dict:
-        """
-        Returns median price per item unit for all the entries collected by different api_request_time
-        """
-        result: Dict[str, int] = {}
+        cursor.execute(
+            'EXECUTE {0}({1})'.format(name, ', '.join(['%s'] * len(params))),
+            params
+        )
 
-        for entry in data:
-            prices_list = data.get(entry)
 
-            result[entry] = np.median(prices_list)
+class PartitionMixin(QueryMixin):
+    """
+    Mixin to contain realm table partitioning operations.
+    """
+    def _create_partitions(self, cursor, day: date, realm_names: Optional[Iterable[str]] = None) -> None:
+        """
+        Creates daily partition for the given day, for all the realm tables unless specified.
+        """
+        if realm_names is None:
+            realm_names = self.REALM_LIST_EU.values()
+
+        for realm_name in realm_names:
+            cursor.execute(
+                self.CREATE_REALM_PARTITION.format(
+                    realm_name,
+                    day.strftime('p%Y%m%d'),
+                    day,
+                    day + timedelta(days=1)
+                )
+            )
 
-        return result
 
-    @staticmethod
-    def get_lowest(data: dict) -> dict:
+class LiveAuctionsMixin(QueryMixin):
+    """
+    Mixin to contain setup of tables write sessions publish into next to realm tables:
+    current snapshot (live auctions) and item stats ones.
+    """
+    def _create_item_stats(self, cursor, realm_name: str) -> None:
         """
-        Returns lowest price per item unit for all the entries collected by different api_request_time
+        Creates realm's item stats table snapshots are aggregated into on publish, and item rollup table
+        stats are read along with; empty, ItemStatsTableMaker backfills them from the collected history.
         """
-        result: Dict[str, int] = {}
-
-        for entry in data:
-            result[entry] = min(data.get(entry))
+        cursor.execute(self.CREATE_ITEM_STATS.format(realm_name))
+        cursor.execute(self.CREATE_ITEM_ROLLUP.format(realm_name))
 
-        return result
+    def _create_live_auctions(self, cursor, realm_name: str) -> None:
+        """
+        Creates realm's current snapshot table (and auction intervals it may be seeded from),
+        seeds it with the latest published snapshot unless it already holds one.
+        """
+        cursor.execute(self.CREATE_AUCTION_INTERVALS.format(realm_name))
+        cursor.execute(self.CREATE_LIVE_AUCTIONS.format(realm_name))
+        cursor.execute(self.SEED_LIVE_AUCTIONS.format(realm_name))
 
 
 class BaseWriteHandler(ABC):
@@ -285,7 +983,7 @@ class BaseWriteHandler(ABC):
         pass
 
 
-class RealmTableMaker(BaseWriteHandler, DatabaseConnection, QueryMixin):
+class RealmTableMaker(BaseWriteHandler, DatabaseConnection, PartitionMixin):
     """
     Used to setup database realm tables.
     """
@@ -298,7 +996,92 @@ class RealmTableMaker(BaseWriteHandler, DatabaseConnection, QueryMixin):
     
     def START(self):
         for realm_id in self.REALM_LIST_EU:
-            self.cursor.execute(self.CREATE_REALMS % self.REALM_LIST_EU[realm_id])
+            self.cursor.execute(self.CREATE_REALMS.format(self.REALM_LIST_EU[realm_id]))
+            self.cursor.execute(self.CREATE_ITEM_STATS.format(self.REALM_LIST_EU[realm_id]))
+            self.cursor.execute(self.CREATE_ITEM_ROLLUP.format(self.REALM_LIST_EU[realm_id]))
+            self.cursor.execute(self.CREATE_AUCTION_INTERVALS.format(self.REALM_LIST_EU[realm_id]))
+            self.cursor.execute(self.CREATE_LIVE_AUCTIONS.format(self.REALM_LIST_EU[realm_id]))
+            self.connection.commit()
+
+        self._create_partitions(self.cursor, date.today())
+        self.connection.commit()
+
+
+class RealmTableMigrator(BaseWriteHandler, DatabaseConnection, PartitionMixin, LiveAuctionsMixin):
+    """
+    Used to migrate existing, not partitioned realm tables into partitioned ones,
+    along with current snapshot tables seeded from them and item stats tables backfilled from them.
+    """
+    def __init__(self):
+        super().__init__()
+        self.cursor = self.connection.cursor()
+
+    def __repr__(self) -> str:
+        return 'RealmTableMigrator'
+
+    def _migrate(self, realm_name: str) -> bool:
+        """
+        Returns False if there is no such realm table at all.
+        """
+        self.cursor.execute(self.READ_TABLE_KIND.format(realm_name))
+        kind = self.cursor.fetchone()
+
+        # missing or already partitioned
+        if kind is None or kind[0] == 'p':
+            print("Skipping realm ", realm_name)
+            return kind is not None
+
+        print("Migrating realm ", realm_name)
+
+        self.cursor.execute(self.RENAME_LEGACY_REALM.format(realm_name))
+        self.cursor.execute(self.CREATE_REALMS.format(realm_name))
+
+        self.cursor.execute(self.READ_LEGACY_DAYS.format(realm_name))
+        days = [row[0] for row in self.cursor.fetchall()]
+        self._create_partitions(self.cursor, date.today(), [realm_name])
+        for day in days:
+            self._create_partitions(self.cursor, day, [realm_name])
+
+        self.cursor.execute(self.MIGRATE_LEGACY_REALM.format(realm_name))
+
+        # item reads fall back to raw rows only while there are no stats at all,
+        # so the migrated history is aggregated right away, before any session adds newer stats
+        self._create_item_stats(self.cursor, realm_name)
+        self.cursor.execute(self.AGGREGATE_ITEM_STATS.format(realm_name, 'TRUE', f'realm_{realm_name}'))
+
+        return True
+
+    def START(self):
+        # single transaction per realm, so a failure leaves the realm table untouched
+        for realm_id in self.REALM_LIST_EU:
+            realm_name = self.REALM_LIST_EU[realm_id]
+
+            if self._migrate(realm_name):
+                self._create_item_stats(self.cursor, realm_name)
+                self._create_live_auctions(self.cursor, realm_name)
+
+            self.connection.commit()
+
+
+class ItemStatsTableMaker(BaseWriteHandler, DatabaseConnection, QueryMixin):
+    """
+    Used to setup item stats tables next to already existing realm tables,
+    backfilling them from all the collected auctions history.
+    """
+    def __init__(self):
+        super().__init__()
+        self.cursor = self.connection.cursor()
+
+    def __repr__(self) -> str:
+        return 'ItemStatsTableMaker'
+
+    def START(self):
+        for realm_id in self.REALM_LIST_EU:
+            realm_name = self.REALM_LIST_EU[realm_id]
+            print("Aggregating item stats for realm ", realm_name)
+            self.cursor.execute(self.CREATE_ITEM_STATS.format(realm_name))
+            self.cursor.execute(self.CREATE_ITEM_ROLLUP.format(realm_name))
+            self.cursor.execute(self.AGGREGATE_ITEM_STATS.format(realm_name, 'TRUE', f'realm_{realm_name}'))
             self.connection.commit()
 
 
@@ -336,7 +1119,7 @@ class DateTableMaker(BaseWriteHandler, DatabaseConnection, QueryMixin):
         self.connection.commit()
 
 
-class AuctionDeleteHandler(BaseWriteHandler, DatabaseConnection, QueryMixin):
+class AuctionDeleteHandler(BaseWriteHandler, DatabaseConnection, LiveAuctionsMixin):
     """
     Optional auction data delete handling class.
     """
@@ -347,75 +1130,451 @@ class AuctionDeleteHandler(BaseWriteHandler, DatabaseConnection, QueryMixin):
     def _delete_auctions(self):
         for realm_id in self.REALM_LIST_EU:
             realm_name = self.REALM_LIST_EU[realm_id]
-            print("Deleting auction data from realm ", realm_name)
-            self.cursor.execute(self.DELETE_AUCTION_DATA.format(realm_name))
+            print("Deleting auction data from realm ", realm_name)
+
+            # tables of deployments older than some of them
+            self._create_item_stats(self.cursor, realm_name)
+            self.cursor.execute(self.CREATE_AUCTION_INTERVALS.format(realm_name))
+            self.cursor.execute(self.CREATE_LIVE_AUCTIONS.format(realm_name))
+
+            self.cursor.execute(self.DELETE_AUCTION_DATA.format(realm_name))
+            self.connection.commit()
+
+    def START(self):
+        self._delete_auctions()
+
+
+class AuctionCompactHandler(BaseWriteHandler, DatabaseConnection, QueryMixin):
+    """
+    Historical auction data retention handling class.
+
+    Raw partitions older than 'raw_days' are rolled up into daily item stats and dropped,
+    daily stats older than 'daily_days' are further rolled up into weekly ones.
+    """
+    def __init__(self, raw_days: int = 14, daily_days: int = 90) -> None:
+        super().__init__()
+        self.cursor = self.connection.cursor()
+
+        self.raw_cutoff: date = date.today() - timedelta(days=raw_days)
+        self.daily_cutoff: date = date.today() - timedelta(days=daily_days)
+
+        # realm name -> reclaimed bytes
+        self.reclaimed: Dict[str, int] = {}
+
+    def __repr__(self) -> str:
+        return f'AuctionCompactHandler({self.raw_cutoff}, {self.daily_cutoff})'
+
+    def _read_size(self, realm_name: str) -> int:
+        self.cursor.execute(self.READ_REALM_SIZE.format(realm_name))
+        return self.cursor.fetchone()[0]
+
+    def _compact_raw(self, realm_name: str) -> None:
+        """
+        Rolls up and drops whole raw partitions beyond the horizon, no row DELETEs involved.
+        """
+        self.cursor.execute(self.READ_REALM_PARTITIONS.format(realm_name))
+
+        for (partition,) in self.cursor.fetchall():
+            day = datetime.strptime(partition.rsplit('_', 1)[1], 'p%Y%m%d').date()
+
+            if day >= self.raw_cutoff:
+                continue
+
+            print("Compacting partition ", partition)
+            self.cursor.execute(
+                self.ROLLUP_DAILY.format(
+                    realm_name,
+                    partition,
+                    day,
+                    day + timedelta(days=1)
+                )
+            )
+            self.connection.commit()
+
+    def _compact_daily(self, realm_name: str) -> None:
+        self.cursor.execute(self.ROLLUP_WEEKLY.format(realm_name, self.daily_cutoff))
+        self.connection.commit()
+
+    def START(self):
+        for realm_id in self.REALM_LIST_EU:
+            realm_name = self.REALM_LIST_EU[realm_id]
+
+            self.cursor.execute(self.CREATE_ITEM_ROLLUP.format(realm_name))
             self.connection.commit()
 
-    def START(self):
-        self._delete_auctions()
+            size_before = self._read_size(realm_name)
+
+            self._compact_raw(realm_name)
+            self._compact_daily(realm_name)
+
+            self.reclaimed[realm_name] = size_before - self._read_size(realm_name)
+            print(f"Realm {realm_name}: reclaimed {self.reclaimed[realm_name] / 2 ** 20:.1f} MB")
 
+        print(f"Total reclaimed {sum(self.reclaimed.values()) / 2 ** 20:.1f} MB")
 
-class RealmWriteHandler(BaseWriteHandler, DatabaseConnection, QueryMixin):
+
+class RealmWriteHandler(BaseWriteHandler, DatabaseConnection, PartitionMixin, LiveAuctionsMixin):
     """
     Auction data writes handling class. 
+
+    Session jobs only COPY auction houses into their staging tables, publish() then moves
+    the whole snapshot into live tables and inserts its time record in a single transaction,
+    so readers never see a partially written snapshot. Sessions never overlap, each one holds
+    an advisory lock from construction until publish(). Current snapshot tables (live_{realm})
+    listings are read from are replaced along, in any mode.
+
+    In delta mode snapshots are not appended to realm tables, auctions are tracked as intervals
+    in auction_intervals_{realm} instead, one row per auction however long it lasts;
+    item stats are aggregated either way.
+
+    Given a SnapshotArchive (streaming only), every staged snapshot is also saved there as columnar files,
+    kept pending until publish() commits it.
     """
-    def __init__(self) -> None:
+    # BlizzAPI base URL, pointed at a local stand-in by benchmarks
+    API_URL: str = 'https://eu.api.blizzard.com'
+
+    def __init__(self, stream: bool = True, delta: bool = False,
+                 archive: Optional[SnapshotArchive] = None) -> None:
         super().__init__()
 
+        # stream auctions directly into the database instead of a .csv cache file
+        self.stream: bool = stream
+        self.delta: bool = delta
+        self.archive: Optional[SnapshotArchive] = archive
         self.cache_path: str = f'{Path(__file__).resolve().parents[1]}/cache/'
-        self.time: str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.extractor = AuctionColumnExtractor(self.TIME_LEFT)
 
-        # insert proper api_request_time record along the object construction
+        # held until publish(), snapshot time is taken once a previous session is over
         self.cursor = self.connection.cursor()
-        self.cursor.execute(self.INSERT_TIME_RECORD % self.time)
+        self.cursor.execute(self.LOCK_WRITE_SESSION)
+        self.time: str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        # partitions session rows are going to land in, item stats, current snapshot and empty staging tables,
+        # api_request_time record is inserted once the snapshot gets published
+        self._create_partitions(self.cursor, datetime.strptime(self.time, '%Y-%m-%d %H:%M:%S').date())
+        for realm_name in self.REALM_LIST_EU.values():
+            self._create_item_stats(self.cursor, realm_name)
+            self._create_live_auctions(self.cursor, realm_name)
+        for realm_id in self.REALM_LIST_EU:
+            for faction_sign in self.FACTIONS:
+                self.cursor.execute(self.CREATE_STAGING_AUCTIONS.format(self._staging_table(realm_id, faction_sign)))
         self.connection.commit()
     
     def __repr__(self) -> str:
         return 'RealmWriteHandler()'
+
+    def _staging_table(self, realm_id: int, faction_sign: str) -> str:
+        return f'staging_{self.REALM_LIST_EU[realm_id]}_{faction_sign.lower()}'
+
+    @timed('publish')
+    def publish(self, jobs: Iterable[tuple]) -> bool:
+        """
+        Publishes staged snapshots of the given (realm_id, faction_sign) jobs: moves them into realm tables
+        (or merges them into auction intervals in delta mode), replaces current snapshot tables, aggregates
+        their item stats and inserts the session's time record, all in a single transaction, then notifies API readers.
+        Ends the session, whether it succeeds or not. Returns False if there was nothing to publish.
+        Archived snapshots are committed only along with published ones, the rest is discarded.
+        """
+        jobs = list(jobs)
+        published = False
+
+        try:
+            published = self._publish(jobs)
+            return published
+
+        finally:
+            try:
+                self.connection.rollback()
+                self.cursor.execute(self.UNLOCK_WRITE_SESSION)
+                self.connection.commit()
+
+            # broken connection, its session is gone along with the lock,
+            # the original error (if any) is the one to be reported
+            except psycopg2.Error:
+                self.connection.close()
+
+            finally:
+                self._settle_archive(jobs if published else [])
+
+    def _settle_archive(self, published_jobs: List[tuple]) -> None:
+        """
+        Commits archived snapshots of published jobs, discards all the other ones of the session.
+        """
+        if self.archive is None:
+            return
+
+        snapshot_time = datetime.strptime(self.time, '%Y-%m-%d %H:%M:%S')
+
+        with span('archive', type(self).__name__):
+            for realm_id, realm_name in self.REALM_LIST_EU.items():
+                for faction_sign in self.FACTIONS:
+                    if (realm_id, faction_sign) in published_jobs:
+                        self.archive.commit(realm_name, faction_sign, snapshot_time)
+                    else:
+                        self.archive.discard(realm_name, faction_sign, snapshot_time)
+
+    def _publish(self, jobs: List[tuple]) -> bool:
+        if not jobs:
+            print(f'PID: {os.getpid()} | {self._log_time()} || Nothing to publish, snapshot {self.time} dropped')
+            return False
+
+        for realm_id, faction_sign in jobs:
+            staging = self._staging_table(realm_id, faction_sign)
+
+            if self.delta:
+                self._apply_delta(self.cursor, realm_id, faction_sign, staging)
+            else:
+                self.cursor.execute(self.PUBLISH_AUCTIONS.format(self.REALM_LIST_EU[realm_id], staging))
+
+            self._replace_live(self.cursor, realm_id, faction_sign, staging)
+            self._aggregate_stats(self.cursor, realm_id, faction_sign, staging)
+
+        self.cursor.execute(self.INSERT_TIME_RECORD % self.time)
+        self.cursor.execute(self.NOTIFY_SNAPSHOT)
+        self.connection.commit()
+
+        # staged rows are no longer needed, tables themselves are reused by the next session
+        for realm_id, faction_sign in jobs:
+            self.cursor.execute(self.TRUNCATE_STAGING_AUCTIONS.format(self._staging_table(realm_id, faction_sign)))
+        self.connection.commit()
+
+        print(f'PID: {os.getpid()} | {self._log_time()} || Published snapshot {self.time} of {len(jobs)} auction houses')
+
+        return True
     
-    def _set_auction_data(self, realm_id: int, faction_sign: str) -> dict:
+    def auction_url(self, realm_id: int, faction_sign: str) -> str:
         """
-        Fetches live auctions data from BlizzAPI and returns it as deserialized JSON.
+        Returns BlizzAPI live auctions URL, access token is expected to be appended.
         """
+        return f'{self.API_URL}/data/wow/connected-realm/{realm_id}/auctions/{self.FACTIONS[faction_sign]}?namespace=dynamic-classic-eu&locale=en_GB&access_token='
 
-        api = BlizzApi(
-            f'https://eu.api.blizzard.com/data/wow/connected-realm/{realm_id}/auctions/{self.FACTIONS[faction_sign]}?namespace=dynamic-classic-eu&locale=en_GB&access_token=')
-        api.get_response()
+    @timed('fetch')
+    def _get_api(self, realm_id: int, faction_sign: str, stream: bool = False) -> BlizzApi:
+        """
+        Makes a BlizzAPI live auctions request, raises TimeoutError if it hangs for too long,
+        BlizzApiError if it fails (e.g. 401, 429, 5xx).
+        """
+        api = BlizzApi(self.auction_url(realm_id, faction_sign))
+        api.get_response(stream=stream)
 
         # connection timeout error handling
         if api.timeout:
             print(f'BlizzAPI request for realm id: {realm_id}, {faction_sign} timed out.')
             raise TimeoutError
 
-        return json.loads(api.response.content)
+        # error bodies have no auctions, they must never be published as empty Auction Houses
+        if not api.response.ok:
+            api.response.close()
+            print(f'BlizzAPI request for realm id: {realm_id}, {faction_sign} failed: {api.response.status_code}')
+            raise BlizzApiError(api.response.status_code)
 
-    def _bulk_write(self, realm_id: int, faction_sign: str) -> None:
+        return api
+
+    def _set_auction_data(self, realm_id: int, faction_sign: str) -> Dict[str, np.ndarray]:
         """
-        Does a 'bulk write' operation based on SQL COPY query from a .csv cache file.
+        Fetches live auctions data from BlizzAPI and returns it as typed columns.
         """
-        # manual psycopg2 connection necessary for multiprocessing (any other way?)
-        connection = psycopg2.connect(
-                database='auctionation2_test',
-                user=USER,
-                password=PASSWORD,
-                host='127.0.0.1',
-                port='5432'
-            )
+        api = self._get_api(realm_id, faction_sign)
 
-        cursor = connection.cursor()
+        with span('decode', type(self).__name__):
+            return self.extractor.extract(api.response.content)
 
-        cursor.execute(
-            self.BULK_CREATE_AUCTIONS %
-                (
-                    self.REALM_LIST_EU[realm_id],
-                    self.cache_path,
-                    realm_id,
-                    faction_sign
+    def _stream_rows(self, chunks: Iterable[bytes], faction_sign: str,
+                     writer: Optional[SnapshotArchiveWriter] = None) -> Iterator[str]:
+        """
+        Yields CSV formatted realm table rows extracted on the fly from raw BlizzAPI response chunks,
+        slice by slice, collecting them into an archive writer along the way, if given.
+        """
+        for columns in self.extractor.extract_chunks(chunks):
+            if writer is not None:
+                writer.extend(columns)
+
+            for row in self._column_auctions(columns, faction_sign):
+                yield '%s,%s,%s,%s,%s,%s,%s\n' % row
+
+    def _column_auctions(self, columns: Dict[str, np.ndarray], faction_sign: str) -> Iterator[tuple]:
+        """
+        Yields realm table rows of auctions extracted as typed columns.
+        """
+        for wow_id, wow_item_id, buyout, quantity, time_left in zip(
+            columns['wow_id'].tolist(),
+            columns['wow_item_id'].tolist(),
+            columns['buyout'].tolist(),
+            columns['quantity'].tolist(),
+            columns['time_left'].tolist()
+        ):
+            yield faction_sign, wow_id, wow_item_id, buyout, quantity, self.time, time_left or ''
+
+    def _archive_writer(self, realm_id: int, faction_sign: str) -> Optional[SnapshotArchiveWriter]:
+        if self.archive is None:
+            return None
+
+        return self.archive.writer(
+            self.REALM_LIST_EU[realm_id],
+            faction_sign,
+            datetime.strptime(self.time, '%Y-%m-%d %H:%M:%S')
+        )
+
+    def _archived_copy(self, realm_id: int, faction_sign: str, chunks: Iterable[bytes]) -> int:
+        """
+        Copies raw BlizzAPI response chunks into the database, then saves the snapshot
+        as a pending archive one once it got staged.
+        """
+        writer = self._archive_writer(realm_id, faction_sign)
+        rows = self._copy_rows(realm_id, faction_sign, self._stream_rows(chunks, faction_sign, writer))
+
+        if writer is not None:
+            with span('archive', type(self).__name__):
+                writer.close()
+
+        return rows
+
+    def _copy_rows(self, realm_id: int, faction_sign: str, lines: Iterator[str]) -> int:
+        """
+        Feeds CSV formatted rows straight into SQL 'COPY ... FROM STDIN' of a staging table,
+        no cache file involved. Returns number of rows written.
+        """
+        # fresh connection, the inherited one must not be shared between processes;
+        # closed whatever happens, so a failed COPY is rolled back before a retry
+        connection = self.get_connection()
+        target = self._staging_table(realm_id, faction_sign)
+
+        try:
+            cursor = connection.cursor()
+
+            # rows are parsed lazily, so in streaming mode this covers download and parsing as well
+            with span('copy', type(self).__name__):
+                cursor.copy_expert(
+                    self.STREAM_CREATE_AUCTIONS % target,
+                    IteratorFile(lines)
                 )
-            )
+            rows = cursor.rowcount
+
+            # planner statistics for the publishing queries
+            cursor.execute(self.ANALYZE_STAGING_AUCTIONS.format(target))
+            connection.commit()
+
+        finally:
+            connection.close()
+
+        ROWS_INGESTED.inc(rows, realm=self.REALM_LIST_EU[realm_id])
+
+        if not rows:
+            print(f'PID: {os.getpid()} | {self._log_time()} || None auctions in realm_id id: {realm_id}, {faction_sign}')
+
+        return rows
+
+    @timed('live')
+    def _replace_live(self, cursor, realm_id: int, faction_sign: str, source: str) -> None:
+        """
+        Replaces realm-faction current snapshot with a staged one, within the publishing transaction.
+        """
+        cursor.execute(
+            self.REPLACE_LIVE_AUCTIONS.format(self.REALM_LIST_EU[realm_id], source),
+            {'time': self.time, 'faction': faction_sign}
+        )
+
+    @timed('stats')
+    def _aggregate_stats(self, cursor, realm_id: int, faction_sign: str, source: str) -> None:
+        """
+        Computes item stats of a staged snapshot, within the publishing transaction.
+        """
+        cursor.execute(
+            self.AGGREGATE_ITEM_STATS.format(
+                self.REALM_LIST_EU[realm_id],
+                'faction=%s AND api_request_time=%s',
+                source
+            ),
+            (faction_sign, self.time)
+        )
+
+    @timed('delta')
+    def _apply_delta(self, cursor, realm_id: int, faction_sign: str, source: str) -> None:
+        """
+        Merges a staged snapshot into auction intervals, within the publishing transaction.
+        """
+        realm_name = self.REALM_LIST_EU[realm_id]
+
+        cursor.execute(self.APPLY_AUCTION_DELTA.format(realm_name, source))
+        opened = cursor.rowcount
+
+        cursor.execute(
+            self.CLOSE_AUCTION_INTERVALS.format(realm_name, source),
+            {'time': self.time, 'faction': faction_sign}
+        )
+
+        print(f'PID: {os.getpid()} | {self._log_time()} || Delta of realm id: {realm_id}, {faction_sign}: {opened} new, {cursor.rowcount} gone')
+
+    def _stream_write(self, realm_id: int, faction_sign: str) -> int:
+        """
+        Streams live auctions from BlizzAPI into the database, returns number of rows written.
+        """
+        # request is made up front, so a timeout never interrupts a running COPY
+        api = self._get_api(realm_id, faction_sign, stream=True)
+
+        print(f'PID: {os.getpid()} | {self._log_time()} || Streaming auctions data from realm id: {realm_id}, {faction_sign} faction')
+
+        try:
+            return self._archived_copy(realm_id, faction_sign, api.response.iter_content(chunk_size=65536))
+
+        finally:
+            api.response.close()
+
+    def write_payload(self, realm_id: int, faction_sign: str, payload: bytes) -> int:
+        """
+        Writes live auctions from an already fetched BlizzAPI response body.
+        Returns number of rows written.
+        """
+        with span('decode', type(self).__name__):
+            columns = self.extractor.extract(payload)
+
+        writer = self._archive_writer(realm_id, faction_sign)
+        rows = self._copy_rows(
+            realm_id,
+            faction_sign,
+            ('%s,%s,%s,%s,%s,%s,%s\n' % row for row in self._column_auctions(columns, faction_sign))
+        )
+
+        if writer is not None:
+            with span('archive', type(self).__name__):
+                writer.extend(columns)
+                writer.close()
+
+        return rows
+
+    def _bulk_write(self, realm_id: int, faction_sign: str) -> int:
+        """
+        Does a 'bulk write' operation based on SQL COPY query from a .csv cache file into a staging table.
+        Returns number of rows written.
+        """
+        # fresh connection, the inherited one must not be shared between processes
+        connection = self.get_connection()
+        target = self._staging_table(realm_id, faction_sign)
+
+        try:
+            cursor = connection.cursor()
 
-        connection.commit()
-        connection.close()
+            with span('copy', type(self).__name__):
+                cursor.execute(
+                    self.BULK_CREATE_AUCTIONS %
+                        (
+                            target,
+                            self.cache_path,
+                            realm_id,
+                            faction_sign
+                        )
+                    )
+            rows = cursor.rowcount
+
+            cursor.execute(self.ANALYZE_STAGING_AUCTIONS.format(target))
+            connection.commit()
+
+        finally:
+            connection.close()
+
+        ROWS_INGESTED.inc(rows, realm=self.REALM_LIST_EU[realm_id])
+
+        return rows
 
     def _log_time(self) -> None:
         return str(datetime.now())
@@ -430,14 +1589,14 @@ class RealmWriteHandler(BaseWriteHandler, DatabaseConnection, QueryMixin):
         auction_data = self._set_auction_data(realm_id, faction_sign)
 
         # ignore empty Auction Houses and break
-        if not auction_data.get('auctions'):  
+        if not len(auction_data['wow_id']):
             print(f'PID: {_pid} | {self._log_time()} || None auctions in realm_id id: {realm_id}, {faction_sign}')
             return False
 
-        print(f'PID: {_pid} | {self._log_time()} || Caching auctions data from realm id: {realm_id}, {faction_sign} faction ({len(auction_data.get("auctions"))} entries)')
+        print(f'PID: {_pid} | {self._log_time()} || Caching auctions data from realm id: {realm_id}, {faction_sign} faction ({len(auction_data["wow_id"])} entries)')
 
         # create .csv file
-        with open(f'{self.cache_path}/{realm_id}_{faction_sign}.csv', 'w', newline='') as csvfile:
+        with span('csv', type(self).__name__), open(f'{self.cache_path}/{realm_id}_{faction_sign}.csv', 'w', newline='') as csvfile:
             writer = csv.writer(csvfile)
             
             # write header
@@ -451,33 +1610,7 @@ class RealmWriteHandler(BaseWriteHandler, DatabaseConnection, QueryMixin):
                 'time_left',
             ])
 
-            for line in auction_data.get('auctions'):
-                # ignore auctions with no set buyout (only bids)
-                if line.get('buyout') == 0:
-                    continue
-                
-                # normalization
-                if line.get('time_left') == 'SHORT':
-                    time_left = 1
-                
-                elif line.get('time_left') == 'MEDIUM':
-                    time_left = 2
-                
-                elif line.get('time_left') == 'LONG':
-                    time_left = 3
-                
-                elif line.get('time_left') == 'VERY_LONG':
-                    time_left = 4
-
-                writer.writerow([
-                    faction_sign,
-                    line.get('id'),
-                    line.get('item').get('id'),
-                    line.get('buyout'),
-                    line.get('quantity'),
-                    self.time,
-                    time_left,
-                ])
+            writer.writerows(self._column_auctions(auction_data, faction_sign))
 
         return True
 
@@ -487,18 +1620,23 @@ class RealmWriteHandler(BaseWriteHandler, DatabaseConnection, QueryMixin):
         """
         os.remove(f'{self.cache_path}/{realm_id}_{faction_sign}.csv')
 
-    @multiprocess_manager.process_mark    
-    def START(self, realm_id: int, faction_sign: str) -> None:
+    def START(self, realm_id: int, faction_sign: str) -> int:
         """
-        Each method call spawns a new process.
+        Stages single realm-faction live auctions, returns number of rows written.
+        Concurrency is up to the caller, see multiprocess_manager.run_session(), and so is publish().
         """
+        if self.stream:
+            return self._stream_write(realm_id, faction_sign)
+
         # break in case of an empty Auction House:
         if not self._cache_auction_data(realm_id, faction_sign):
-            return None
+            return 0
 
-        self._bulk_write(realm_id, faction_sign)
+        rows = self._bulk_write(realm_id, faction_sign)
         self._clear_cache(realm_id, faction_sign)
 
+        return rows
+
 
 class ItemDataPopulator(BaseWriteHandler, QueryMixin, DatabaseConnection):
     """
@@ -514,30 +1652,53 @@ class ItemDataPopulator(BaseWriteHandler, QueryMixin, DatabaseConnection):
     def START(self) -> None:
         cursor = self.connection.cursor()
         cursor.execute(self.POPULATE_ITEM_DATA % (self.path))
+        cursor.execute(self.NOTIFY_ITEM_DATA)
         self.connection.commit()
 
 
-class ItemReadHandler(DatabaseConnection, QueryMixin):
+class ItemReadHandler(PooledDatabaseConnection, PreparedQueryMixin, RenderedResponseMixin):
     """
     Item data reads handling class.
+
+    Responses are kept in memory as rendered JSON until a new snapshot gets published.
     """
-    def __init__(self, realm_name: str, faction_sign: str, wow_item_id: int):
-        super().__init__()
+    # same for pre-aggregated and computed stats
+    STATS_KEYS = StatsCalculator.KEYS
 
+    def __init__(self, realm_name: str, faction_sign: str, wow_item_id: int):
         self._realm_name =   realm_name
         self._faction_sign = faction_sign
         self._wow_item_id =  wow_item_id
 
-        self._raw_data = self._read_raw_data()
+        cache_key = (self._realm_name, self._faction_sign, self._wow_item_id)
 
-        # overall output is set as an instance attribute utilizing multiprocessing's "Pool"
-        self.response: Dict[str, Dict[str, int]] = multiprocess_manager.compute_reads(
-            func1=  StatsCalculator.get_lowest,
-            func2=  StatsCalculator.get_mean,
-            func3=  StatsCalculator.get_median,
-            func4=  StatsCalculator.get_count,
-            data=   self._raw_data
-        )
+        # served from memory between snapshots, without borrowing a connection at all
+        if SnapshotClock.peek() is not None:
+            cached = item_cache.get(cache_key)
+
+            if cached is not None:
+                self.connection = None
+                self.response, self._rendered = cached
+                return
+
+        super().__init__()
+        generation = SnapshotClock.generation
+
+        try:
+            # overall output is set as an instance attribute, served from pre-aggregated stats
+            self.response: Dict[str, Dict[str, int]] = self._read_stats()
+
+            # history collected before stats were aggregated at write time
+            if not self.response['count']:
+                self._raw_data = self._read_raw_data()
+
+        finally:
+            self.release()
+
+        if not self.response['count']:
+            self.response = multiprocess_manager.compute_reads(StatsCalculator.get_all, *self._raw_data)
+
+        item_cache.set(cache_key, (self.response, self.rendered), generation)
 
     def __repr__(self) -> str:
         return f'ItemReadHandler({self._realm_name, self._faction_sign, self._wow_item_id})'
@@ -545,46 +1706,199 @@ class ItemReadHandler(DatabaseConnection, QueryMixin):
     def __str__(self) -> str:
         return f'ItemReadHandler instance: {self._realm_name}, {self._faction_sign}, {self._wow_item_id}'
 
-    def _read_raw_data(self) -> dict:
+    @timed('query')
+    def _read_stats(self) -> Dict[str, dict]:
         """
-        Makes a direct read from the database based on instance attributes (request parameters).
+        Reads pre-aggregated per-snapshot item stats based on instance attributes (request parameters).
         """
         cursor = self.connection.cursor()
-        cursor.execute(
-            self.READ_ITEM_DATA % (
-                self._realm_name,
-                self._faction_sign,
-                self._wow_item_id
-            )
+        self._execute_prepared(
+            cursor,
+            f'read_item_stats_{self._realm_name}',
+            self.READ_ITEM_STATS.format(self._realm_name),
+            (self._faction_sign, self._wow_item_id)
         )
 
-        fetched_data = cursor.fetchall()
+        result: Dict[str, dict] = {key: {} for key in self.STATS_KEYS}
 
-        price_date_map: Dict[str, int] = {}
+        for row in cursor.fetchall():
+            date_value = f'{row[0]}'
 
-        for row in fetched_data:
-            # hardcoded row data values:
-            date_value =        f'{row[1]}'
-            buyout_value =      row[0]
-            quantity_value =    row[2]
+            for key, value in zip(result, row[1:]):
+                result[key][date_value] = value
+
+        return result
+
+    @timed('raw_data')
+    def _read_raw_data(self) -> tuple:
+        """
+        Makes a direct read from the database based on instance attributes (request parameters).
+        Returns columnar data: api_request_time, buyout and quantity arrays.
+        """
+        cursor = self.connection.cursor()
+        self._execute_prepared(
+            cursor,
+            f'read_item_data_{self._realm_name}',
+            self.READ_ITEM_DATA.format(self._realm_name),
+            (self._faction_sign, self._wow_item_id)
+        )
 
-            if not price_date_map.get(date_value):
-                price_date_map[date_value] = []
+        fetched_data = cursor.fetchall()
+        count = len(fetched_data)
 
-            #  !! price per unit !!
-            price_date_map[date_value].append(buyout_value / quantity_value) 
+        # hardcoded row data values: buyout, api_request_time, quantity
+        buyouts =       np.fromiter((row[0] for row in fetched_data), dtype=np.int64, count=count)
+        times =         np.array([row[1] for row in fetched_data], dtype='datetime64[s]')
+        quantities =    np.fromiter((row[2] for row in fetched_data), dtype=np.int64, count=count)
 
-        return price_date_map
+        return times, buyouts, quantities
     
 
-class ItemSearchHandler(DatabaseConnection, QueryMixin):
+class ItemBatchReadHandler(PooledDatabaseConnection, QueryMixin, RenderedResponseMixin):
     """
-    Item read by search query handling class.
+    Many items data reads handling class, e.g. user's observed items.
+
+    All the histories are read with a single query, items with no pre-aggregated stats
+    are computed together with one more query and a single stats pass.
     """
-    def __init__(self, item_slug: str, page: int, limit: int):
+    def __init__(self, realm_name: str, faction_sign: str, wow_item_ids: Optional[List[int]] = None,
+                 user_id: Optional[int] = None):
         super().__init__()
+
+        self._realm_name =   realm_name
+        self._faction_sign = faction_sign
+        self._user_id =      user_id
+
         self.cursor = self.connection.cursor()
+        self._raw_data = None
+
+        try:
+            self._wow_item_ids: List[int] = sorted(set(wow_item_ids or []) | set(self._read_watchlist()))
+
+            # overall output is set as an instance attribute
+            self.response: Dict[str, Dict[str, dict]] = self._read_stats()
+
+            missing = [wow_item_id for wow_item_id in self._wow_item_ids if not self.response[str(wow_item_id)]['count']]
+            if missing:
+                self._raw_data = self._read_raw_data(missing)
+
+        finally:
+            self.release()
+
+        if self._raw_data is not None:
+            computed = multiprocess_manager.compute_reads(StatsCalculator.get_all_by_item, *self._raw_data)
+
+            for wow_item_id, stats in computed.items():
+                self.response[str(wow_item_id)] = stats
+
+    def __repr__(self) -> str:
+        return f'ItemBatchReadHandler({self._realm_name, self._faction_sign, self._user_id})'
+
+    def _read_watchlist(self) -> List[int]:
+        if self._user_id is None:
+            return []
+
+        self.cursor.execute(self.READ_WATCHLIST, (self._user_id,))
+
+        return [row[0] for row in self.cursor.fetchall()]
+
+    @timed('query')
+    def _read_stats(self) -> Dict[str, Dict[str, dict]]:
+        if not self._wow_item_ids:
+            return {}
+
+        self.cursor.execute(
+            self.READ_ITEMS_STATS.format(self._realm_name),
+            {'faction': self._faction_sign, 'wow_item_ids': self._wow_item_ids}
+        )
+
+        result: Dict[str, Dict[str, dict]] = {
+            str(wow_item_id): {key: {} for key in ItemReadHandler.STATS_KEYS}
+            for wow_item_id in self._wow_item_ids
+        }
+
+        for row in self.cursor.fetchall():
+            item_stats = result[str(row[0])]
+            date_value = f'{row[1]}'
+
+            for key, value in zip(ItemReadHandler.STATS_KEYS, row[2:]):
+                item_stats[key][date_value] = value
+
+        return result
+
+    @timed('raw_data')
+    def _read_raw_data(self, wow_item_ids: List[int]) -> tuple:
+        """
+        Returns columnar data of given items: wow_item_id, api_request_time, buyout and quantity arrays.
+        """
+        self.cursor.execute(
+            self.READ_ITEMS_DATA.format(self._realm_name),
+            {'faction': self._faction_sign, 'wow_item_ids': wow_item_ids}
+        )
+
+        fetched_data = self.cursor.fetchall()
+        count = len(fetched_data)
+
+        # hardcoded row data values: wow_item_id, buyout, api_request_time, quantity
+        item_ids =      np.fromiter((row[0] for row in fetched_data), dtype=np.int64, count=count)
+        buyouts =       np.fromiter((row[1] for row in fetched_data), dtype=np.int64, count=count)
+        times =         np.array([row[2] for row in fetched_data], dtype='datetime64[s]')
+        quantities =    np.fromiter((row[3] for row in fetched_data), dtype=np.int64, count=count)
+
+        return item_ids, times, buyouts, quantities
+
+
+class CrossRealmReadHandler(PooledDatabaseConnection, QueryMixin, RenderedResponseMixin):
+    """
+    Single item latest prices across all the realms and factions, read with one query.
+    """
+    def __init__(self, wow_item_id: int):
+        super().__init__()
+
+        self._wow_item_id = wow_item_id
+
+        try:
+            # output is set as an instance attribute
+            self.response: Dict[str, Dict[str, dict]] = self._read_data()
+
+        finally:
+            self.release()
+
+    def __repr__(self) -> str:
+        return f'CrossRealmReadHandler({self._wow_item_id})'
+
+    @timed('query')
+    def _read_data(self) -> Dict[str, Dict[str, dict]]:
+        cursor = self.connection.cursor()
+        cursor.execute(
+            ' UNION ALL '.join(
+                self.READ_LATEST_ITEM_STATS.format(realm_name, faction_sign)
+                for realm_name in self.REALM_LIST_EU.values()
+                for faction_sign in self.FACTIONS
+            ),
+            {'wow_item_id': self._wow_item_id}
+        )
+
+        result: Dict[str, Dict[str, dict]] = {}
+        for row in cursor.fetchall():
+            # hardcoded row data values: realm, faction, api_request_time, lowest, median, count
+            result.setdefault(row[0], {})[row[1]] = {
+                'api_request_time': f'{row[2]}',
+                'lowest':           row[3],
+                'median':           row[4],
+                'count':            row[5]
+            }
+
+        return result
+
 
+class ItemSearchHandler(PooledDatabaseConnection, PreparedQueryMixin, RenderedResponseMixin):
+    """
+    Item read by search query handling class.
+
+    Served from the in-process search index once it is loaded, from the database otherwise.
+    """
+    def __init__(self, item_slug: str, page: int, limit: int):
         self._item_slug = item_slug
 
         # pagination params
@@ -593,20 +1907,25 @@ class ItemSearchHandler(DatabaseConnection, QueryMixin):
         # declare how many entries to skip from start
         self._offset = (self._page - 1) * self._limit
 
-        self.response = self._read_data()
+        if search_index.ready:
+            self.connection = None
+            with span('search', type(self).__name__):
+                self.response = self._serialize(search_index.search(self._item_slug, self._offset, self._limit))
+            return
+
+        super().__init__()
+        self.cursor = self.connection.cursor()
+
+        try:
+            self.response = self._read_data()
+
+        finally:
+            self.release()
     
     def __repr__(self) -> str:
         return f'ItemSearchHandler({self._item_slug, self._page, self._limit})'
 
-    def _read_data(self) -> List[dict]:
-        self.cursor.execute(
-            self.READ_ITEM_SEARCH.format(
-                self._item_slug,
-                self._offset,
-                self._limit
-            )
-        )
-        fetched_data = self.cursor.fetchall()
+    def _serialize(self, fetched_data: List[tuple]) -> List[dict]:
         result: List[dict] = []
         for row in fetched_data:
             result.append(
@@ -625,15 +1944,26 @@ class ItemSearchHandler(DatabaseConnection, QueryMixin):
             )
         return result
 
+    @timed('query')
+    def _read_data(self) -> List[dict]:
+        self._execute_prepared(
+            self.cursor,
+            'read_item_search',
+            self.READ_ITEM_SEARCH,
+            (self.like_pattern(self._item_slug), self._offset, self._limit)
+        )
+        return self._serialize(self.cursor.fetchall())
+
 
-class AuctionReadHandler(DatabaseConnection, QueryMixin):
+class AuctionReadHandler(PooledDatabaseConnection, PreparedQueryMixin, RenderedResponseMixin):
     """
     Auction data reads handling class.
+
+    Supports both offset (page) and keyset (cursor) pagination, the latter one
+    is used when 'page_cursor' is given, an empty string standing for the first page.
     """
     def __init__(self, realm_name: str, faction_sign: str, item_slug: str,
-                 page: int, limit: int):
-        super().__init__()
-
+                 page: int, limit: int, page_cursor: Optional[str] = None):
         self._realm_name =   realm_name
         self._faction_sign = faction_sign
         self._item_slug =    item_slug
@@ -641,31 +1971,98 @@ class AuctionReadHandler(DatabaseConnection, QueryMixin):
         # pagination params
         self._page =         page
         self._limit =        limit
+        self._page_cursor =  page_cursor
 
         # declare how many entries to skip from start
         self._offset =       (self._page - 1) * self._limit
 
+        cache_key = (
+            self._realm_name,
+            self._faction_sign,
+            self._item_slug,
+            self._page if self._page_cursor is None else self._page_cursor,
+            self._limit
+        )
+
+        # served from memory between snapshots, without borrowing a connection at all
+        if SnapshotClock.peek() is not None:
+            cached = auction_cache.get(cache_key)
+
+            if cached is not None:
+                self.connection = None
+                self.response, self._rendered = cached
+                return
+
+        super().__init__()
         self.cursor = self.connection.cursor()
 
         # output is set as an instance attribute
-        self.response = self._read_data()
+        try:
+            self._time = SnapshotClock.get(self.cursor)
+            self._generation = generation = SnapshotClock.generation
+
+            # nothing written yet
+            if self._time is None:
+                self.response = [] if self._page_cursor is None else {'results': [], 'next': None, 'count': 0}
+
+            elif self._page_cursor is None:
+                self.response = self._read_data()
+            else:
+                self.response = self._read_page()
+
+        finally:
+            self.release()
+
+        auction_cache.set(cache_key, (self.response, self.rendered), generation)
 
     def __repr__(self) -> str:
         return 'AuctionReadHandler({0}, {1}, {2}, {3}, {4}, {5})'.format(self._realm_name, self._faction_sign,
-                                                                    self._item_slug, self._page, self._limit)
+                                                                    self._item_slug, self._page, self._limit,
+                                                                    self._page_cursor)
 
-    def _read_data(self) -> List[dict]:
-        self.cursor.execute(
-            self.READ_AUCTION_DATA.format(
-                self._realm_name,
-                self._faction_sign,
-                self._item_slug,
-                self._offset,
-                self._limit
-            )
+    def _slug_filter(self) -> tuple:
+        """
+        Returns item slug condition variant, its SQL and its parameter ($2),
+        slug is resolved to item ids by the search index when loaded.
+        """
+        if not search_index.ready:
+            return 'like', self.SLUG_LIKE, self.like_pattern(self._item_slug)
+
+        return 'ids', self.SLUG_ITEM_IDS.format(self._realm_name), sorted(search_index.match_ids(self._item_slug))
+
+    def _execute_auction_query(self, name: str, query: str, *params) -> None:
+        """
+        Executes one of the auction reads prepared per realm table and slug condition variant.
+        Current snapshot table holds nothing else, so snapshot time is not a parameter.
+        """
+        variant, condition, slug_param = self._slug_filter()
+
+        self._execute_prepared(
+            self.cursor,
+            f'{name}_{self._realm_name}_{variant}',
+            query.format(self._realm_name, condition),
+            (self._faction_sign, slug_param) + params
         )
 
-        fetched_data = self.cursor.fetchall()
+    @staticmethod
+    def encode_cursor(wow_id: int) -> str:
+        return base64.urlsafe_b64encode(str(wow_id).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(page_cursor: str) -> int:
+        """
+        Returns last seen wow_id, raises ValueError in case of a malformed cursor.
+        """
+        if not page_cursor:
+            return -1
+
+        try:
+            return int(base64.urlsafe_b64decode(page_cursor.encode()))
+
+        except (binascii.Error, UnicodeError) as e:
+            raise ValueError(page_cursor) from e
+
+    def _serialize(self, fetched_data: List[tuple]) -> List[dict]:
         result: List[dict] = []
         for row in fetched_data:
             # serializing
@@ -682,4 +2079,48 @@ class AuctionReadHandler(DatabaseConnection, QueryMixin):
                     }
                 }
             )
-        return result
\ No newline at end of file
+        return result
+
+    @timed('query')
+    def _read_data(self) -> List[dict]:
+        self._execute_auction_query('read_auction_data', self.READ_AUCTION_DATA, self._offset, self._limit)
+
+        return self._serialize(self.cursor.fetchall())
+
+    @timed('count')
+    def _read_count(self) -> int:
+        """
+        Returns total count of matching live auctions, counted once per snapshot.
+        """
+        key = (self._realm_name, self._faction_sign, self._item_slug, self._time)
+        count = count_cache.get(key)
+
+        if count is None:
+            self._execute_auction_query('read_auction_count', self.READ_AUCTION_COUNT)
+            count = self.cursor.fetchone()[0]
+
+            count_cache.set(key, count, self._generation)
+
+        return count
+
+    @timed('query')
+    def _read_page(self) -> dict:
+        # one extra row tells whether there is a next page at all
+        self._execute_auction_query(
+            'read_auction_after',
+            self.READ_AUCTION_DATA_AFTER,
+            self.decode_cursor(self._page_cursor),
+            self._limit + 1
+        )
+        fetched_data = self.cursor.fetchall()
+
+        next_cursor = None
+        if len(fetched_data) > self._limit:
+            fetched_data = fetched_data[:self._limit]
+            next_cursor = self.encode_cursor(fetched_data[-1][0])
+
+        return {
+            'results':  self._serialize(fetched_data),
+            'next':     next_cursor,
+            'count':    self._read_count()
+        }
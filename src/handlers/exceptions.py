@@ -5,4 +5,9 @@ Auctionation2 exceptions.
 
 class TimeoutError(Exception):
     """Raised when connection with BlizzAPI hangs for too long."""
+    pass
+
+
+class BlizzApiError(Exception):
+    """Raised when BlizzAPI responds with an error status, or with an error body."""
     pass
\ No newline at end of file
@@ -0,0 +1,353 @@
+"""
+AuctioNation2 streaming ingest resources.
+"""
+
+import codecs
+import io
+import json
+import re
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .exceptions import BlizzApiError
+
+# optional faster JSON decoders, stdlib one is always there
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+
+# name -> decoder of a raw (bytes) JSON document
+JSON_BACKENDS: Dict[str, Callable[[bytes], Any]] = {'json': json.loads}
+
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = orjson.loads
+
+if simdjson is not None:
+    JSON_BACKENDS['simdjson'] = simdjson.loads
+
+# fastest available one, might be overridden
+JSON_BACKEND: str = next(name for name in ('orjson', 'simdjson', 'json') if name in JSON_BACKENDS)
+
+
+def json_loads(data: bytes) -> Any:
+    """
+    Decodes raw JSON document with the selected JSON_BACKEND.
+    """
+    return JSON_BACKENDS[JSON_BACKEND](data)
+
+
+class AuctionStreamParser:
+    """
+    Incrementally extracts single auction entries from a raw BlizzAPI response body.
+
+    Only the "auctions" array is decoded, one object at a time, so the whole payload
+    never has to be held in memory as a deserialized structure.
+    """
+    AUCTIONS_KEY = re.compile(r'"auctions"\s*:\s*\[')
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+
+        self._buffer: str = ''
+        self._position: int = 0
+        self._exhausted: bool = False
+
+    def __repr__(self) -> str:
+        return 'AuctionStreamParser()'
+
+    def __iter__(self) -> Iterator[dict]:
+        if not self._seek_auctions():
+            return
+
+        while True:
+            if not self._skip_separators():
+                return
+
+            if self._buffer[self._position] == ']':
+                return
+
+            try:
+                entry, end = self._decoder.raw_decode(self._buffer, self._position)
+
+            except json.JSONDecodeError:
+                # object split between chunks, read some more and retry
+                if not self._read_chunk():
+                    raise
+                continue
+
+            self._position = end
+            yield entry
+
+    def _read_chunk(self) -> bool:
+        """
+        Appends next chunk to the buffer, dropping already consumed part of it.
+        Returns False when the response body is exhausted.
+        """
+        if self._exhausted:
+            return False
+
+        try:
+            chunk = next(self._chunks)
+
+        except StopIteration:
+            self._exhausted = True
+            self._buffer += self._text_decoder.decode(b'', final=True)
+            return False
+
+        self._buffer = self._buffer[self._position:] + self._text_decoder.decode(chunk)
+        self._position = 0
+
+        return True
+
+    def _seek_auctions(self) -> bool:
+        """
+        Moves the position right behind the opening bracket of the "auctions" array.
+        Returns False in case the payload has no auctions at all.
+        """
+        while True:
+            match = self.AUCTIONS_KEY.search(self._buffer, self._position)
+
+            if match:
+                self._position = match.end()
+                return True
+
+            # keep the tail, the key itself might be split between chunks
+            self._position = max(self._position, len(self._buffer) - 32)
+
+            if not self._read_chunk():
+                return False
+
+    def _skip_separators(self) -> bool:
+        """
+        Skips whitespaces and commas between array entries.
+        Returns False in case the payload ends unexpectedly.
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in ' \t\r\n,':
+                self._position += 1
+
+            if self._position < len(self._buffer):
+                return True
+
+            if not self._read_chunk():
+                return False
+
+
+class IteratorFile(io.TextIOBase):
+    """
+    Read-only file-like object fed lazily from an iterator of text lines.
+
+    Used as a psycopg2 copy_expert() source, so rows can be streamed into
+    'COPY ... FROM STDIN' without any intermediate file.
+    """
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._pending: List[str] = []
+        self._pending_size: int = 0
+
+    def __repr__(self) -> str:
+        return 'IteratorFile()'
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or self._pending_size < size:
+            try:
+                line = next(self._lines)
+
+            except StopIteration:
+                break
+
+            self._pending.append(line)
+            self._pending_size += len(line)
+
+        data = ''.join(self._pending)
+
+        if size < 0 or len(data) <= size:
+            self._pending = []
+            self._pending_size = 0
+            return data
+
+        self._pending = [data[size:]]
+        self._pending_size = len(data) - size
+
+        return data[:size]
+
+
+class AuctionColumnExtractor:
+    """
+    Projects BlizzAPI auction entries straight into typed NumPy arrays:
+    wow_id, wow_item_id, buyout, quantity and time_left (as TIME_LEFT codes, 0 if unknown).
+
+    Compact BlizzAPI payloads are matched with a single regular expression, so no per-auction
+    dicts are ever built; anything it does not fully account for (unexpected key order,
+    whitespaces) is decoded with json_loads() instead. Auctions with no buyout (or quantity) are dropped.
+
+    Streamed response bodies are extracted slice by slice, see extract_chunks().
+    """
+    # between two auctions of a compact payload, never within one (item objects have no nested ids)
+    BOUNDARY: bytes = b'},{"id":'
+
+    AUCTIONS_KEY = re.compile(rb'"auctions"\s*:\s*\[')
+
+    AUCTION = re.compile(
+        rb'\{"id":(\d+),"item":\{"id":(\d+)[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
+        rb'(?:,"bid":\d+)?(?:,"buyout":(\d+))?,"quantity":(\d+),"time_left":"(\w+)"\}'
+    )
+
+    COLUMNS: Dict[str, type] = {
+        'wow_id':       np.int64,
+        'wow_item_id':  np.int32,
+        'buyout':       np.int64,
+        'quantity':     np.int32,
+        'time_left':    np.int8
+    }
+
+    def __init__(self, time_left: Dict[str, int], slice_size: int = 1 << 20):
+        self.time_left = time_left
+
+        # bytes of a streamed response body extracted at once
+        self.slice_size = slice_size
+
+    def __repr__(self) -> str:
+        return 'AuctionColumnExtractor()'
+
+    def _time_left_codes(self, values: np.ndarray) -> np.ndarray:
+        codes = np.zeros(len(values), dtype=np.int8)
+
+        for key, code in self.time_left.items():
+            codes[values == key.encode()] = code
+
+        return codes
+
+    def _match(self, payload: bytes) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Returns columns matched with the regular expression, None if some auctions were left out.
+        """
+        matches = self.AUCTION.findall(payload)
+
+        if len(matches) != payload.count(b'"time_left"'):
+            return None
+
+        # fixed width byte strings, parsed into integers by NumPy in one go
+        fields = [np.array([match[i] for match in matches], dtype=np.bytes_) for i in range(5)]
+
+        # no buyout (bid only auction) becomes 0
+        fields[2][fields[2] == b''] = b'0'
+
+        columns = {
+            column: fields[i].astype(dtype)
+            for i, (column, dtype) in enumerate(self.COLUMNS.items())
+            if column != 'time_left'
+        }
+        columns['time_left'] = self._time_left_codes(fields[4])
+
+        return columns
+
+    def _columns(self, auctions: List[dict]) -> Dict[str, np.ndarray]:
+        """
+        Returns columns of already decoded auction entries.
+        """
+        return {
+            'wow_id':       np.array([line['id'] for line in auctions], dtype=np.int64),
+            'wow_item_id':  np.array([line['item']['id'] for line in auctions], dtype=np.int32),
+            'buyout':       np.array([line.get('buyout') or 0 for line in auctions], dtype=np.int64),
+            'quantity':     np.array([line.get('quantity') or 0 for line in auctions], dtype=np.int32),
+            'time_left':    np.array([self.time_left.get(line.get('time_left'), 0) for line in auctions], dtype=np.int8)
+        }
+
+    def _decode(self, payload: bytes) -> Dict[str, np.ndarray]:
+        """
+        Returns columns of a fully decoded payload.
+        """
+        return self._columns(json_loads(payload).get('auctions') or [])
+
+    @staticmethod
+    def _listed(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        listed = (columns['buyout'] != 0) & (columns['quantity'] != 0)
+
+        return {column: values[listed] for column, values in columns.items()}
+
+    def _check(self, payload: bytes) -> None:
+        """
+        Raises BlizzApiError if the payload (or its head) is an error response, so those are never
+        taken for empty Auction Houses. Any JSON object with no "auctions" array and no error
+        fields ("code", "detail") is an empty Auction House, BlizzAPI omits the key for those.
+        """
+        if self.AUCTIONS_KEY.search(payload) is not None:
+            return
+
+        try:
+            document = json_loads(payload)
+
+        except ValueError:
+            raise BlizzApiError(f'malformed response: {payload[:64]!r}')
+
+        if not isinstance(document, dict) or 'code' in document or 'detail' in document:
+            raise BlizzApiError(f'error response: {payload[:64]!r}')
+
+    def extract(self, payload: bytes) -> Dict[str, np.ndarray]:
+        self._check(payload)
+        columns = self._match(payload)
+
+        if columns is None:
+            columns = self._decode(payload)
+
+        return self._listed(columns)
+
+    def _extract_slice(self, fragment: bytes, first: bool) -> Dict[str, np.ndarray]:
+        """
+        Returns columns of a payload fragment holding whole auctions only (the first one
+        starts with the payload head, the last one ends with its tail).
+        """
+        if first:
+            self._check(fragment)
+
+        columns = self._match(fragment)
+
+        # not a document on its own, its auctions are decoded one by one
+        if columns is None:
+            prefix = b'' if first else b'"auctions":['
+            columns = self._columns(list(AuctionStreamParser([prefix + fragment + b']'])))
+
+        return self._listed(columns)
+
+    def extract_chunks(self, chunks: Iterable[bytes]) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Yields columns of a response body read in chunks, extracted in slices of about 'slice_size'
+        bytes cut at auction boundaries, so extraction overlaps with the download.
+        Payloads with no boundary to cut at (not compact ones) are extracted as a whole.
+        """
+        buffer = bytearray()
+        first = True
+
+        for chunk in chunks:
+            buffer += chunk
+
+            if len(buffer) < self.slice_size:
+                continue
+
+            cut = buffer.rfind(self.BOUNDARY)
+            if cut == -1:
+                continue
+
+            yield self._extract_slice(bytes(buffer[:cut + 1]), first)
+            del buffer[:cut + 2]
+            first = False
+
+        if first:
+            yield self.extract(bytes(buffer))
+        else:
+            yield self._extract_slice(bytes(buffer), first)
@@ -0,0 +1,233 @@
+"""
+AuctioNation2 instrumentation resources.
+"""
+
+import functools
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+
+class Counter:
+    """
+    Monotonic counter, one value per combination of label values.
+    """
+    TYPE: str = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'Counter({self.name!r})'
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> Dict[tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, values: Dict[tuple, float]) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0.0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [
+            (self.name, dict(zip(self.labels, key)), value)
+            for key, value in sorted(self.collect().items())
+        ]
+
+
+class Histogram(Counter):
+    """
+    Distribution of observed values (seconds, mostly) over fixed buckets,
+    along with their sum and count.
+    """
+    TYPE: str = 'histogram'
+
+    BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def __repr__(self) -> str:
+        return f'Histogram({self.name!r})'
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+
+        with self._lock:
+            # [per-bucket counts..., sum, count]
+            entry = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+                    break
+
+            entry[-2] += value
+            entry[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> Dict[tuple, list]:
+        with self._lock:
+            return {key: list(entry) for key, entry in self._values.items()}
+
+    def merge(self, values: Dict[tuple, list]) -> None:
+        with self._lock:
+            for key, entry in values.items():
+                current = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+
+                for i, value in enumerate(entry):
+                    current[i] += value
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        result = []
+
+        for key, entry in sorted(self.collect().items()):
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                result.append((f'{self.name}_bucket', dict(labels, le=repr(bound)), cumulative))
+
+            result.append((f'{self.name}_bucket', dict(labels, le='+Inf'), entry[-1]))
+            result.append((f'{self.name}_sum', labels, entry[-2]))
+            result.append((f'{self.name}_count', labels, entry[-1]))
+
+        return result
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics collection.
+
+    Worker processes ship collect() results back to the parent one, which merge()s them.
+    """
+    def __init__(self):
+        self.metrics: Dict[str, Counter] = {}
+
+    def __repr__(self) -> str:
+        return f'MetricsRegistry({len(self.metrics)} metrics)'
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, documentation, labels))
+
+    def collect(self) -> Dict[str, dict]:
+        return {name: metric.collect() for name, metric in self.metrics.items()}
+
+    def merge(self, collected: Dict[str, dict]) -> None:
+        for name, values in collected.items():
+            if name in self.metrics:
+                self.metrics[name].merge(values)
+
+    def reset(self) -> None:
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def render(self) -> str:
+        """
+        Returns all the metrics in Prometheus text exposition format.
+        """
+        lines: List[str] = []
+
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+
+            for name, labels, value in metric.samples():
+                if labels:
+                    rendered = ','.join(f'{label}="{value}"' for label, value in labels.items())
+                    lines.append(f'{name}{{{rendered}}} {value}')
+                else:
+                    lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    'auctionation_stage_seconds',
+    'Time spent in handler stages.',
+    ('handler', 'stage')
+)
+ROWS_INGESTED = registry.counter(
+    'auctionation_rows_ingested_total',
+    'Auction rows written by write sessions.',
+    ('realm',)
+)
+CACHE_REQUESTS = registry.counter(
+    'auctionation_cache_requests_total',
+    'Read cache lookups.',
+    ('cache', 'result')
+)
+POOL_WAIT_SECONDS = registry.histogram(
+    'auctionation_pool_wait_seconds',
+    'Time spent waiting for a pooled database connection.'
+)
+STATS_COMPUTATIONS = registry.counter(
+    'auctionation_stats_computations_total',
+    'Statistics computations, by where they ran.',
+    ('executor',)
+)
+REQUEST_SECONDS = registry.histogram(
+    'auctionation_http_request_seconds',
+    'API request latency.',
+    ('route', 'method', 'status')
+)
+
+
+def span(stage: str, handler: str):
+    """
+    Times a block of code as a handler stage.
+    """
+    return STAGE_SECONDS.time(handler=handler, stage=stage)
+
+
+def timed(stage: str) -> Callable:
+    """
+    Decorator timing a handler method as a stage, labeled with the handler class name.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with span(stage, type(self).__name__):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -2,63 +2,141 @@
 AuctioNation2 multiprocessing resources.
 """
 
-from multiprocessing import Process, Pool
-from typing import Callable
+from multiprocessing import Pool, get_context
+from typing import Callable, List, Optional
 
+import time
 
-def process_mark(func):
+from .exceptions import BlizzApiError, TimeoutError
+from .metrics import STATS_COMPUTATIONS, registry, timed
+
+
+# per-worker session state, set up by pool initializer
+_session_func: Optional[Callable] = None
+_session_retries: int = 0
+_session_backoff: float = 0.0
+
+
+def _init_session_worker(func: Callable, retries: int, backoff: float) -> None:
     """
-    Decorator to spawn new process upon function call.
+    Pool initializer, binds session job function to the worker process.
     """
-    def wrapper(*args, **kwargs):
-        p = Process(
-            target=func,
-            args=(args),
-            kwargs=(kwargs)
-        )
+    global _session_func, _session_retries, _session_backoff
 
-        p.start()
+    _session_func = func
+    _session_retries = retries
+    _session_backoff = backoff
 
-    return wrapper
 
-
-def compute_reads(func1: Callable, func2: Callable, func3: Callable, func4: Callable, 
-                    data: list):
+def _run_session_job(job: tuple) -> dict:
     """
-    Collect all statistics as a pool of processes.
+    Runs single session job, retrying with exponential backoff on BlizzAPI timeouts and errors.
+    Never raises, any failure is reported back within the result, along with job's metrics.
     """
-    pool = Pool()
+    # worker's metrics are shipped back per job, parent process merges them
+    registry.reset()
+
+    start = time.monotonic()
+    attempt = 0
+
+    while True:
+        attempt += 1
+
+        try:
+            rows = _session_func(*job)
+            error = None
+            break
 
-    result_dict = {
-        'lowest':   None,
-        'mean':     None,
-        'median':   None,
-        'count':    None
+        except (TimeoutError, BlizzApiError) as e:
+            if attempt > _session_retries:
+                rows, error = None, repr(e)
+                break
+
+            time.sleep(_session_backoff * 2 ** (attempt - 1))
+
+        except Exception as e:
+            rows, error = None, repr(e)
+            break
+
+    return {
+        'job':      job,
+        'rows':     rows,
+        'error':    error,
+        'attempts': attempt,
+        'duration': time.monotonic() - start,
+        'metrics':  registry.collect()
     }
 
-    # Hardcoded callback functions:
-    def lowest(result):
-        result_dict['lowest'] = result
 
-    def mean(result):
-        result_dict['mean'] = result
-    
-    def median(result):
-        result_dict['median'] = result
-    
-    def count(result):
-        result_dict['count'] = result
+def run_session(func: Callable, jobs: List[tuple], workers: int, retries: int = 3,
+                backoff: float = 5.0, callback: Optional[Callable] = None) -> List[dict]:
+    """
+    Run all the session jobs on a bounded pool of processes and collect their results.
+
+    'func' gets called with each job's arguments and should return number of rows written,
+    optional 'callback' receives every job result as soon as it completes.
+    """
+    results: List[dict] = []
+
+    # fork keeps 'func' (usually a bound handler method) unpickled
+    with get_context('fork').Pool(
+        processes=      workers,
+        initializer=    _init_session_worker,
+        initargs=       (func, retries, backoff)
+    ) as pool:
+        for result in pool.imap_unordered(_run_session_job, jobs):
+            results.append(result)
 
+            if callback:
+                callback(result)
 
-    for target_callback, func in ((lowest, func1), (mean, func2), (median, func3),
-                                    (count, func4)):
-        pool.apply_async(
-            func=       func,
-            args=       (data,),
-            callback=   target_callback
-        )
+    return results
 
-    pool.close()
-    pool.join()
 
-    return result_dict
+class StatsExecutor:
+    """
+    Long-lived process pool for statistics computations, meant to be started once
+    along the API application and shared by all the read handlers.
+
+    Payloads smaller than 'inline_threshold' entries (and all the payloads while the pool
+    is not started) are computed in the calling process, as shipping them costs more than the math.
+    """
+    def __init__(self, processes: Optional[int] = None, inline_threshold: int = 50000):
+        self.processes = processes
+        self.inline_threshold = inline_threshold
+        self._pool = None
+
+    def __repr__(self) -> str:
+        return f'StatsExecutor({self.processes}, {self.inline_threshold})'
+
+    def start(self) -> None:
+        if self._pool is None:
+            self._pool = Pool(processes=self.processes)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    @timed('compute')
+    def compute(self, func: Callable, *data):
+        """
+        Runs 'func' over the payload as a single task, returns its result.
+        """
+        if self._pool is None or len(data[0]) < self.inline_threshold:
+            STATS_COMPUTATIONS.inc(executor='inline')
+            return func(*data)
+
+        STATS_COMPUTATIONS.inc(executor='pool')
+        return self._pool.apply(func, data)
+
+
+stats_executor = StatsExecutor()
+
+
+def compute_reads(func: Callable, *data):
+    """
+    Collect all statistics with the shared stats executor.
+    """
+    return stats_executor.compute(func, *data)
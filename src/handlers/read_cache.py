@@ -0,0 +1,87 @@
+"""
+AuctioNation2 in-memory read cache resources.
+"""
+
+import threading
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from .metrics import CACHE_REQUESTS
+from .snapshot import SnapshotClock
+
+
+class ReadCache:
+    """
+    Bounded LRU cache of read handler responses, kept along with their rendered JSON,
+    so cache hits skip serialization as well.
+
+    Entries belong to the SnapshotClock generation they were stored in and are all dropped
+    once a new snapshot gets published.
+    """
+    def __init__(self, name: str, max_entries: int = 4096):
+        self.name = name
+        self.max_entries = max_entries
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._entries: OrderedDict = OrderedDict()
+        self._generation: int = SnapshotClock.generation
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'ReadCache({self.name!r}, {self.max_entries})'
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sync(self) -> None:
+        if self._generation != SnapshotClock.generation:
+            self._entries.clear()
+            self._generation = SnapshotClock.generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            self._sync()
+
+            if key not in self._entries:
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache=self.name, result='miss')
+                return None
+
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache=self.name, result='hit')
+            self._entries.move_to_end(key)
+
+            return self._entries[key]
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        """
+        Stores value computed within the given SnapshotClock generation, stale ones are ignored.
+        """
+        with self._lock:
+            self._sync()
+
+            if generation != self._generation:
+                return
+
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# live auction listings, (realm, faction, slug, page or cursor, limit) keyed,
+# (response, rendered JSON bytes) valued
+auction_cache = ReadCache('auctions')
+
+# item stats histories, (realm, faction, wow_item_id) keyed, valued as above
+item_cache = ReadCache('items')
+
+# total counts of live auction listings, (realm, faction, slug, api_request_time) keyed
+count_cache = ReadCache('auction_counts')
+
+# URLs of successful snapshot bound responses, (path, query, ETag) keyed, only these get 304s
+etag_cache = ReadCache('etags', max_entries=65536)
@@ -0,0 +1,238 @@
+"""
+AuctioNation2 in-process item search resources.
+"""
+
+import heapq
+import threading
+
+from collections import Counter, OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+
+class _IndexData(NamedTuple):
+    """
+    Single immutable generation of the index, swapped whole on every (re)build.
+    """
+    # wow_item_id -> item_data row
+    items: Dict[int, tuple]
+    # wow_item_id -> name slug
+    slugs: Dict[int, str]
+    # n-gram -> wow_item_ids of slugs containing it
+    postings: Dict[str, Set[int]]
+    # slug word -> wow_item_ids of slugs made of it
+    words: Dict[str, Set[int]]
+    # padded trigram -> slug words containing it
+    word_postings: Dict[str, Set[str]]
+
+
+class ItemSearchIndex:
+    """
+    In-memory n-gram inverted index of item_data name slugs.
+
+    Loaded on API startup (and reloaded by SnapshotListener whenever item_data gets populated)
+    and then answers substring queries ranked by match quality, falling back to per-word trigram
+    similarity for typo tolerance, without touching the database.
+
+    It is 'ready' only once it holds some items, read handlers query the database until then.
+    """
+    READ_ITEMS: str = """--sql
+        SELECT * FROM item_data
+    """
+
+    # channel item_data writers announce changes on
+    CHANNEL: str = 'item_data_changed'
+
+    # how often an empty index is reloaded, in case a change went unannounced
+    RELOAD_INTERVAL: float = 300.0
+
+    # minimum trigram similarity of a query word and a slug word to match fuzzily
+    FUZZY_THRESHOLD: float = 0.3
+
+    # number of recent (query, offset, limit) results kept, autocomplete repeats itself a lot
+    CACHE_SIZE: int = 1024
+
+    def __init__(self):
+        self.ready: bool = False
+
+        # queries read the whole generation at once, a reload never mixes two of them
+        self._index: _IndexData = _IndexData({}, {}, {}, {}, {})
+
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'ItemSearchIndex({len(self._index.items)} items)'
+
+    @staticmethod
+    def _grams(text: str, size: int) -> Set[str]:
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    @classmethod
+    def _padded_trigrams(cls, text: str) -> Set[str]:
+        return cls._grams(f'  {text} ', 3)
+
+    @staticmethod
+    def _words(slug: str) -> List[str]:
+        return [word for word in slug.split('-') if word]
+
+    def load(self, connection) -> None:
+        """
+        (Re)builds the index from item_data table.
+        """
+        cursor = connection.cursor()
+        cursor.execute(self.READ_ITEMS)
+        self.build(cursor.fetchall())
+
+    def build(self, rows: List[tuple]) -> None:
+        """
+        (Re)builds the index from item_data rows, that is (wow_item_id, name, name_slug, ...).
+        """
+        index = _IndexData({}, {}, {}, {}, {})
+
+        for row in rows:
+            wow_item_id, slug = row[0], row[2] or ''
+
+            index.items[wow_item_id] = row
+            index.slugs[wow_item_id] = slug
+
+            # plain 1-3 grams for substring lookups
+            for gram in self._grams(slug, 1) | self._grams(slug, 2) | self._grams(slug, 3):
+                index.postings.setdefault(gram, set()).add(wow_item_id)
+
+            # padded trigrams of single words for similarity
+            for word in self._words(slug):
+                if word not in index.words:
+                    for trigram in self._padded_trigrams(word):
+                        index.word_postings.setdefault(trigram, set()).add(word)
+
+                index.words.setdefault(word, set()).add(wow_item_id)
+
+        with self._lock:
+            self._index = index
+            self._cache = OrderedDict()
+            self.ready = bool(index.items)
+
+    def _snapshot(self) -> _IndexData:
+        with self._lock:
+            return self._index
+
+    def match_ids(self, query: str, index: Optional[_IndexData] = None) -> Set[int]:
+        """
+        Returns ids of all the items which slug contains the query.
+        """
+        if index is None:
+            index = self._snapshot()
+
+        if not query:
+            return set(index.slugs)
+
+        grams = self._grams(query, min(len(query), 3))
+        candidates = set.intersection(*(index.postings.get(gram, set()) for gram in grams))
+
+        return {wow_item_id for wow_item_id in candidates if query in index.slugs[wow_item_id]}
+
+    @staticmethod
+    def _rank(query: str, slug: str) -> Tuple[int, int, str]:
+        """
+        Exact match first, then slug prefix, then word prefix, then any substring;
+        shorter slugs first within each group.
+        """
+        if slug == query:
+            group = 0
+        elif slug.startswith(query):
+            group = 1
+        elif f'-{query}' in slug:
+            group = 2
+        else:
+            group = 3
+
+        return group, len(slug), slug
+
+    def _similar_words(self, index: _IndexData, query_word: str) -> Dict[str, float]:
+        """
+        Returns slug words similar to a query word (trigram Dice coefficient) with their scores.
+        """
+        trigrams = self._padded_trigrams(query_word)
+        shared: Counter = Counter()
+
+        for trigram in trigrams:
+            shared.update(index.word_postings.get(trigram, ()))
+
+        scores = {}
+        for word, count in shared.items():
+            score = 2 * count / (len(trigrams) + len(self._padded_trigrams(word)))
+            if score >= self.FUZZY_THRESHOLD:
+                scores[word] = score
+
+        return scores
+
+    def _fuzzy_ids(self, index: _IndexData, query: str, exclude: Set[int]) -> List[int]:
+        """
+        Returns ids of items similar to the query, most similar first. Every query word has to be
+        similar to some word of the slug, item's score is the mean of its best word scores.
+        """
+        query_words = self._words(query)
+        if not query_words:
+            return []
+
+        # wow_item_id -> best score of each query word matched so far
+        matched: Dict[int, List[float]] = {}
+
+        for position, query_word in enumerate(query_words):
+            best: Dict[int, float] = {}
+
+            for word, score in self._similar_words(index, query_word).items():
+                for wow_item_id in index.words[word]:
+                    if score > best.get(wow_item_id, 0.0):
+                        best[wow_item_id] = score
+
+            if position == 0:
+                matched = {wow_item_id: [score] for wow_item_id, score in best.items() if wow_item_id not in exclude}
+            else:
+                matched = {wow_item_id: scores + [best[wow_item_id]] for wow_item_id, scores in matched.items() if wow_item_id in best}
+
+        scored = sorted(
+            (-sum(scores) / len(scores), len(index.slugs[wow_item_id]), wow_item_id)
+            for wow_item_id, scores in matched.items()
+        )
+
+        return [wow_item_id for _, _, wow_item_id in scored]
+
+    def search(self, query: str, offset: int, limit: int) -> List[tuple]:
+        """
+        Returns ranked item_data rows matching the query, fuzzy matches follow exact ones.
+        """
+        query = query.lower()
+        key = (query, offset, limit)
+
+        with self._lock:
+            index = self._index
+
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        matches = self.match_ids(query, index)
+        ranked = heapq.nsmallest(
+            offset + limit,
+            matches,
+            key=lambda wow_item_id: self._rank(query, index.slugs[wow_item_id])
+        )
+
+        # typo tolerance, only needed when exact matches do not fill the page
+        if len(ranked) < offset + limit and len(query) >= 3:
+            ranked += self._fuzzy_ids(index, query, matches)
+
+        result = [index.items[wow_item_id] for wow_item_id in ranked[offset:offset + limit]]
+
+        with self._lock:
+            # results of a replaced generation are not cached
+            if self._index is index:
+                self._cache[key] = result
+                if len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+
+        return result
+
+
+search_index = ItemSearchIndex()
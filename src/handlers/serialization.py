@@ -0,0 +1,76 @@
+"""
+AuctioNation2 JSON response serialization resources.
+"""
+
+import json
+
+from datetime import date
+from decimal import Decimal
+from typing import Any, Optional
+
+import numpy as np
+
+from .metrics import span
+
+# optional, several times faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ResponseEncoder(json.JSONEncoder):
+    """
+    Stdlib fallback encoder, aware of NumPy values, Decimals (PostgreSQL numerics) and dates.
+    """
+    def default(self, obj):
+        if isinstance(obj, np.integer):
+            return int(obj)
+
+        if isinstance(obj, (np.floating, Decimal)):
+            return float(obj)
+
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+
+        if isinstance(obj, date):
+            return str(obj)
+
+        return super().default(obj)
+
+
+def _orjson_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+
+    raise TypeError
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Renders response content into JSON bytes, with orjson when available.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+    return json.dumps(content, cls=ResponseEncoder, separators=(',', ':')).encode()
+
+
+class RenderedResponseMixin:
+    """
+    Read handlers mixin, 'rendered' is handler's 'response' as JSON bytes, rendered once.
+    Handlers serving responses from a cache may set it up front.
+    """
+    _rendered: Optional[bytes] = None
+
+    @property
+    def rendered(self) -> bytes:
+        if self._rendered is None:
+            with span('serialize', type(self).__name__):
+                self._rendered = dumps(self.response)
+
+        return self._rendered
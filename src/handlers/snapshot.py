@@ -0,0 +1,155 @@
+"""
+AuctioNation2 live snapshot tracking resources.
+"""
+
+import select
+import threading
+import time
+
+from datetime import datetime
+from typing import Optional
+
+import psycopg2
+
+from .search import ItemSearchIndex, search_index
+
+
+class SnapshotClock:
+    """
+    Caches latest published api_request_time, so read handlers resolve it once
+    per 'TTL' seconds instead of with every query.
+
+    'generation' is bumped each time a new snapshot shows up (or gets announced),
+    read caches use it to drop their entries.
+    """
+    TTL: float = 60.0
+
+    # while SnapshotListener is connected, new snapshots are announced, no need to re-check often
+    LISTENING_TTL: float = 3600.0
+    listening: bool = False
+
+    # channel write sessions announce published snapshots on
+    CHANNEL: str = 'snapshot_published'
+
+    READ_LATEST_TIME: str = """--sql
+        SELECT api_request_time
+        FROM api_request_time_record
+        ORDER BY id DESC
+        LIMIT 1
+    """
+
+    generation: int = 0
+
+    _time: Optional[datetime] = None
+    _checked: float = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def peek(cls) -> Optional[datetime]:
+        """
+        Returns cached latest api_request_time, or None if there is no fresh one.
+        """
+        ttl = cls.LISTENING_TTL if cls.listening else cls.TTL
+
+        with cls._lock:
+            if cls._time is not None and time.monotonic() - cls._checked < ttl:
+                return cls._time
+
+            return None
+
+    @classmethod
+    def get(cls, cursor) -> Optional[datetime]:
+        """
+        Returns latest api_request_time, reading it with the given cursor only if the cached one is stale.
+        """
+        cached = cls.peek()
+        if cached is not None:
+            return cached
+
+        cursor.execute(cls.READ_LATEST_TIME)
+        row = cursor.fetchone()
+
+        with cls._lock:
+            latest = row[0] if row else None
+
+            if latest != cls._time:
+                cls.generation += 1
+
+            cls._time = latest
+            cls._checked = time.monotonic()
+
+            return cls._time
+
+    @classmethod
+    def invalidate(cls) -> None:
+        with cls._lock:
+            cls._checked = 0.0
+            cls.generation += 1
+
+
+class SnapshotListener(threading.Thread):
+    """
+    Background thread LISTENing for published snapshots, invalidates SnapshotClock
+    (and so all the read caches) as soon as a write session commits a new one.
+
+    Also reloads the item search index whenever item_data gets populated,
+    and every ItemSearchIndex.RELOAD_INTERVAL seconds while it is still empty.
+    """
+    def __init__(self, params: dict, poll_timeout: float = 5.0):
+        super().__init__(name='SnapshotListener', daemon=True)
+        self._params = params
+        self._poll_timeout = poll_timeout
+        self._stopped = threading.Event()
+        self._index_loaded: float = time.monotonic()
+
+    def __repr__(self) -> str:
+        return 'SnapshotListener()'
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _reload_index(self, connection) -> None:
+        self._index_loaded = time.monotonic()
+        search_index.load(connection)
+
+    def _listen(self) -> None:
+        connection = psycopg2.connect(**self._params)
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+
+        try:
+            connection.cursor().execute(f'LISTEN {SnapshotClock.CHANNEL}')
+            connection.cursor().execute(f'LISTEN {ItemSearchIndex.CHANNEL}')
+
+            # anything might have been published while not listening
+            SnapshotClock.invalidate()
+            SnapshotClock.listening = True
+
+            while not self._stopped.is_set():
+                if not search_index.ready and time.monotonic() - self._index_loaded > ItemSearchIndex.RELOAD_INTERVAL:
+                    self._reload_index(connection)
+
+                if select.select([connection], [], [], self._poll_timeout) == ([], [], []):
+                    continue
+
+                connection.poll()
+                channels = {notify.channel for notify in connection.notifies}
+                connection.notifies.clear()
+
+                if SnapshotClock.CHANNEL in channels:
+                    SnapshotClock.invalidate()
+
+                if ItemSearchIndex.CHANNEL in channels:
+                    self._reload_index(connection)
+
+        finally:
+            SnapshotClock.listening = False
+            connection.close()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+
+            # lost connection, SnapshotClock TTL keeps reads correct meanwhile
+            except psycopg2.Error:
+                self._stopped.wait(self._poll_timeout)
@@ -0,0 +1,162 @@
+"""
+AuctioNation2 statistical calculation resources.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+
+class StatsCalculator:
+    """
+    Main static class used for various statistical calculations.
+
+    Operates on columnar data: equally sized NumPy arrays of api_request_time, buyout
+    and quantity, one entry per auction. All the statistics for all the snapshots
+    are produced by a single sort followed by grouped reductions.
+
+    KEYS match item_stats columns (and their order), so responses computed from raw history
+    have the same shape as pre-aggregated ones.
+    """
+    KEYS = (
+        'lowest',
+        'mean',
+        'median',
+        'count',
+        'quantity',
+        'percentile_25',
+        'percentile_75',
+        'weighted_mean',
+        'weighted_median'
+    )
+
+    @staticmethod
+    def group(times: np.ndarray, buyouts: np.ndarray, quantities: np.ndarray) -> tuple:
+        """
+        Sorts auctions by api_request_time, then by price per item unit.
+        Returns unique times, group start indices, group sizes and sorted unit prices, buyouts, quantities.
+        """
+        buyouts = np.asarray(buyouts, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        unit_prices = buyouts / quantities
+
+        order = np.lexsort((unit_prices, times))
+        times = times[order]
+
+        keys, starts, counts = np.unique(times, return_index=True, return_counts=True)
+
+        return keys, starts, counts, unit_prices[order], buyouts[order], quantities[order]
+
+    @staticmethod
+    def get_lowest(unit_prices: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """
+        Returns lowest price per item unit of each snapshot.
+        """
+        return unit_prices[starts]
+
+    @staticmethod
+    def get_mean(unit_prices: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """
+        Returns mean price per item unit of each snapshot.
+        """
+        return np.add.reduceat(unit_prices, starts) / counts
+
+    @staticmethod
+    def get_median(unit_prices: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """
+        Returns median price per item unit of each snapshot.
+        """
+        lower = unit_prices[starts + (counts - 1) // 2]
+        upper = unit_prices[starts + counts // 2]
+
+        return (lower + upper) / 2
+
+    @staticmethod
+    def get_percentile(unit_prices: np.ndarray, starts: np.ndarray, counts: np.ndarray,
+                       fraction: float) -> np.ndarray:
+        """
+        Returns given percentile of price per item unit of each snapshot,
+        interpolated the same way as PostgreSQL percentile_cont().
+        """
+        position = starts + (counts - 1) * fraction
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+
+        return unit_prices[lower] + (unit_prices[upper] - unit_prices[lower]) * (position - lower)
+
+    @staticmethod
+    def get_quantity(quantities: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """
+        Returns total quantity of item units listed in each snapshot.
+        """
+        return np.add.reduceat(quantities, starts).astype(np.int64)
+
+    @staticmethod
+    def get_weighted_mean(buyouts: np.ndarray, quantities: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """
+        Returns quantity-weighted mean price per item unit of each snapshot.
+        """
+        return np.add.reduceat(buyouts, starts) / np.add.reduceat(quantities, starts)
+
+    @staticmethod
+    def get_weighted_median(unit_prices: np.ndarray, quantities: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """
+        Returns quantity-weighted median price per item unit of each snapshot,
+        that is the price at which half of all the listed units could be bought.
+        """
+        cumulative = np.cumsum(quantities)
+        totals = np.add.reduceat(quantities, starts)
+        preceding = cumulative[starts] - quantities[starts]
+
+        return unit_prices[np.searchsorted(cumulative, preceding + totals / 2, side='left')]
+
+    @classmethod
+    def get_all_by_item(cls, item_ids: np.ndarray, times: np.ndarray, buyouts: np.ndarray,
+                        quantities: np.ndarray) -> Dict[int, dict]:
+        """
+        Returns all the statistics of many items at once, keyed by wow_item_id first.
+        """
+        order = np.argsort(item_ids, kind='stable')
+        item_ids, times = item_ids[order], times[order]
+        buyouts, quantities = buyouts[order], quantities[order]
+
+        keys, starts = np.unique(item_ids, return_index=True)
+        ends = np.append(starts[1:], len(item_ids))
+
+        return {
+            int(key): cls.get_all(times[start:end], buyouts[start:end], quantities[start:end])
+            for key, start, end in zip(keys, starts, ends)
+        }
+
+    @classmethod
+    def get_all(cls, times: np.ndarray, buyouts: np.ndarray, quantities: np.ndarray) -> Dict[str, dict]:
+        """
+        Returns all the statistics for all the entries collected by different api_request_time,
+        keyed by statistic name, then by api_request_time string.
+        """
+        result: Dict[str, dict] = {key: {} for key in cls.KEYS}
+
+        if not len(times):
+            return result
+
+        keys, starts, counts, unit_prices, buyouts, quantities = cls.group(times, buyouts, quantities)
+
+        columns = (
+            cls.get_lowest(unit_prices, starts, counts),
+            cls.get_mean(unit_prices, starts, counts),
+            cls.get_median(unit_prices, starts, counts),
+            counts,
+            cls.get_quantity(quantities, starts),
+            cls.get_percentile(unit_prices, starts, counts, 0.25),
+            cls.get_percentile(unit_prices, starts, counts, 0.75),
+            cls.get_weighted_mean(buyouts, quantities, starts),
+            cls.get_weighted_median(unit_prices, quantities, starts)
+        )
+
+        # datetime64 renders as 'YYYY-MM-DDTHH:MM:SS', keep str(datetime) format instead
+        dates = [str(key).replace('T', ' ') for key in keys]
+
+        for key, column in zip(cls.KEYS, columns):
+            result[key] = dict(zip(dates, column.tolist()))
+
+        return result
@@ -0,0 +1,177 @@
+"""
+AuctioNation2 SQL query tracing resources.
+"""
+
+import json
+import re
+import textwrap
+import threading
+import time
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+
+class QueryTracer:
+    """
+    Keeps recently executed queries (text, parameters, duration, row count) in memory.
+
+    Queries slower than 'threshold' seconds are kept apart, plain reads together with their
+    EXPLAIN (ANALYZE, BUFFERS) plan, and appended to a log file, if given (JSON lines).
+    Note ANALYZE executes a slow query once more, so only single SELECTs calling no functions
+    but READ_FUNCTIONS (never e.g. pg_advisory_lock() or setval()) and EXECUTEs of prepared
+    statements, all of which are reads, are explained.
+    """
+    SELECT = re.compile(r'^\s*(?:--[^\n]*\n\s*)*[(\s]*SELECT\b', re.IGNORECASE)
+    EXECUTE = re.compile(r'^\s*(?:--[^\n]*\n\s*)*EXECUTE\b', re.IGNORECASE)
+
+    # side effect free functions read queries call, along with keywords a parenthesis may follow
+    READ_FUNCTIONS = frozenset({
+        'count', 'min', 'max', 'sum', 'avg', 'round', 'coalesce', 'greatest', 'least',
+        'percentile_cont', 'date_trunc', 'any', 'all', 'in', 'exists', 'from', 'as', 'over',
+        'filter', 'group', 'and', 'or', 'not', 'on', 'join', 'where', 'select'
+    })
+    CALL = re.compile(r'\b([a-z_][a-z0-9_]*)\s*\(', re.IGNORECASE)
+    LITERAL_OR_COMMENT = re.compile(r"'(?:[^']|'')*'|--[^\n]*")
+
+    def __init__(self, recent: int = 256, slow: int = 64):
+        self.enabled: bool = False
+        self.threshold: float = 0.2
+        self.explain: bool = True
+        self.log_path: Optional[Path] = None
+
+        self.recent: deque = deque(maxlen=recent)
+        self.slow: deque = deque(maxlen=slow)
+
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'QueryTracer({self.enabled}, {self.threshold})'
+
+    def enable(self, threshold: float = 0.2, explain: bool = True, log_path: Optional[Path] = None) -> None:
+        """
+        Turns tracing on for connections opened from now on.
+        """
+        self.threshold = threshold
+        self.explain = explain
+        self.log_path = log_path
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    @classmethod
+    def explainable(cls, query: str) -> bool:
+        """
+        Returns True if query is known to be a plain read, safe to be executed once more.
+        """
+        if cls.EXECUTE.match(query):
+            return True
+
+        if not cls.SELECT.match(query):
+            return False
+
+        code = cls.LITERAL_OR_COMMENT.sub("''", query).strip().rstrip(';')
+
+        # EXPLAIN covers the first statement only, the rest would simply run again
+        if ';' in code:
+            return False
+
+        return {name.lower() for name in cls.CALL.findall(code)} <= cls.READ_FUNCTIONS
+
+    @staticmethod
+    def _clean(query: str) -> str:
+        """
+        Drops QueryMixin's leading '--sql' marker and common indentation.
+        """
+        query = query.strip()
+
+        if query.startswith('--sql'):
+            query = query[len('--sql'):]
+
+        return textwrap.dedent(query.strip('\n')).strip()
+
+    def record(self, cursor, query: str, params, duration: float) -> None:
+        entry = {
+            'time':         datetime.now().isoformat(sep=' ', timespec='seconds'),
+            'query':        self._clean(query),
+            'params':       repr(params) if params is not None else None,
+            'duration_ms':  round(duration * 1000, 3),
+            'rows':         cursor.rowcount
+        }
+
+        with self._lock:
+            self.recent.append(entry)
+
+        if duration < self.threshold:
+            return
+
+        if self.explain and self.explainable(query):
+            entry['plan'] = self._explain(cursor.connection, query, params)
+
+        with self._lock:
+            self.slow.append(entry)
+
+        if self.log_path is not None:
+            with open(self.log_path, 'a') as log_file:
+                log_file.write(json.dumps(entry) + '\n')
+
+    @staticmethod
+    def _explain(connection, query: str, params) -> List[str]:
+        """
+        Returns query plan lines, within a savepoint, so a failure leaves caller's transaction intact.
+        """
+        cursor = connection.cursor(cursor_factory=psycopg2.extensions.cursor)
+        savepoint = not connection.autocommit
+
+        if savepoint:
+            cursor.execute('SAVEPOINT query_tracer')
+
+        try:
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS) ' + query, params)
+            plan = [row[0] for row in cursor.fetchall()]
+
+        except psycopg2.Error as e:
+            plan = [f'EXPLAIN failed: {e}'.strip()]
+
+        if savepoint:
+            cursor.execute('ROLLBACK TO SAVEPOINT query_tracer')
+
+        cursor.close()
+
+        return plan
+
+    def entries(self) -> dict:
+        """
+        Returns traced queries, newest first.
+        """
+        with self._lock:
+            return {
+                'threshold_ms': self.threshold * 1000,
+                'slow':         list(reversed(self.slow)),
+                'recent':       list(reversed(self.recent))
+            }
+
+
+class TracingCursor(psycopg2.extensions.cursor):
+    """
+    psycopg2 cursor recording every execute() with the shared query_tracer,
+    used as connections' cursor_factory while tracing is enabled.
+    """
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        result = super().execute(query, vars)
+
+        # failed queries raise as usual, untraced
+        if query_tracer.enabled:
+            query_tracer.record(self, query, vars, time.perf_counter() - start)
+
+        return result
+
+
+query_tracer = QueryTracer()
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, create_engine
+from sqlalchemy import ForeignKey, create_engine, text
 from sqlalchemy import Column, String, BigInteger, Integer, Text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
@@ -58,3 +58,11 @@ def setup_tables():
 
     Base.metadata.create_all(database)
 
+    # trigram index speeds up "name_slug LIKE '%...%'" item searches
+    with database.begin() as connection:
+        connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        connection.execute(text(
+            'CREATE INDEX IF NOT EXISTS item_data_name_slug_trgm_idx '
+            'ON item_data USING gin (name_slug gin_trgm_ops)'
+        ))
+
@@ -0,0 +1,120 @@
+"""
+SnapshotArchive tests.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import psycopg2
+import pytest
+
+from src.handlers.archive import SnapshotArchive
+from src.handlers.database import RealmWriteHandler
+
+
+TIME = '2026-01-01 12:00:00'
+SNAPSHOT_TIME = datetime(2026, 1, 1, 12)
+
+COLUMNS = {
+    'wow_id':       np.array([1, 4, 5]),
+    'wow_item_id':  np.array([10, 12, 10]),
+    'buyout':       np.array([500, 1200, 700]),
+    'quantity':     np.array([1, 4, 7]),
+    'time_left':    np.array([3, 0, 4]),
+}
+
+
+def write(archive: SnapshotArchive, realm_name: str = 'everlook', faction_sign: str = 'a') -> None:
+    writer = archive.writer(realm_name, faction_sign, SNAPSHOT_TIME)
+    writer.extend({column: values[:1] for column, values in COLUMNS.items()})
+    writer.extend({column: values[1:] for column, values in COLUMNS.items()})
+    writer.close()
+
+
+def test_snapshots_are_pending_until_committed(tmp_path):
+    for compress in (False, True):
+        archive = SnapshotArchive(tmp_path / str(compress), compress=compress)
+        write(archive)
+
+        assert archive.snapshots('everlook', 'a') == []
+        assert archive.commit('everlook', 'a', SNAPSHOT_TIME)
+        assert archive.snapshots('everlook', 'a') == [SNAPSHOT_TIME]
+
+        columns = archive.read('everlook', 'a', SNAPSHOT_TIME)
+        for column, values in COLUMNS.items():
+            assert columns[column].tolist() == values.tolist()
+
+        assert not archive.commit('everlook', 'a', SNAPSHOT_TIME)
+
+
+def test_discarded_snapshots_are_gone(tmp_path):
+    archive = SnapshotArchive(tmp_path)
+    write(archive)
+
+    archive.discard('everlook', 'a', SNAPSHOT_TIME)
+
+    assert not archive.commit('everlook', 'a', SNAPSHOT_TIME)
+    assert archive.snapshots('everlook', 'a') == []
+
+
+def test_item_history(tmp_path):
+    archive = SnapshotArchive(tmp_path)
+    write(archive)
+    archive.commit('everlook', 'a', SNAPSHOT_TIME)
+
+    times, buyouts, quantities = archive.item_history('everlook', 'a', 10)
+
+    assert times.tolist() == [SNAPSHOT_TIME] * 2
+    assert buyouts.tolist() == [500, 700]
+    assert quantities.tolist() == [1, 7]
+
+
+def test_only_published_snapshots_are_committed(tmp_path):
+    # no database connection, only archive settling is exercised
+    handler = RealmWriteHandler.__new__(RealmWriteHandler)
+    handler.time = TIME
+    handler.archive = SnapshotArchive(tmp_path)
+
+    write(handler.archive, 'everlook', 'a')
+    write(handler.archive, 'everlook', 'h')
+    write(handler.archive, 'auberdine', 'a')
+
+    handler._settle_archive([(4440, 'a')])
+
+    assert handler.archive.snapshots('everlook', 'a') == [SNAPSHOT_TIME]
+    assert handler.archive.snapshots('everlook', 'h') == []
+    assert handler.archive.snapshots('auberdine', 'a') == []
+    assert not handler.archive.commit('everlook', 'h', SNAPSHOT_TIME)
+    assert not handler.archive.commit('auberdine', 'a', SNAPSHOT_TIME)
+
+
+class BrokenConnection:
+    closed = False
+
+    def rollback(self):
+        raise psycopg2.InterfaceError('connection already closed')
+
+    def close(self):
+        self.closed = True
+
+
+def test_snapshots_are_discarded_when_publishing_breaks_the_connection(tmp_path):
+    handler = RealmWriteHandler.__new__(RealmWriteHandler)
+    handler.time = TIME
+    handler.archive = SnapshotArchive(tmp_path)
+    handler.connection = BrokenConnection()
+
+    def publish_failure(jobs):
+        raise RuntimeError('publish failed')
+
+    handler._publish = publish_failure
+
+    write(handler.archive, 'everlook', 'a')
+
+    # the publish error is reported, not the one of the broken connection
+    with pytest.raises(RuntimeError, match='publish failed'):
+        handler.publish([(4440, 'a')])
+
+    assert handler.connection.closed
+    assert handler.archive.snapshots('everlook', 'a') == []
+    assert not handler.archive.commit('everlook', 'a', SNAPSHOT_TIME)
@@ -0,0 +1,183 @@
+"""
+AsyncBlizzApi tests, against a local BlizzAPI stub server.
+"""
+
+import asyncio
+import json
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import controller
+
+from src.handlers.async_connection import AsyncBlizzApi
+from src.handlers.connection import BlizzApi
+from src.handlers.exceptions import BlizzApiError
+
+
+LAST_MODIFIED = 'Thu, 01 Jan 2026 12:00:00 GMT'
+
+PAYLOAD = b'{"_links":{},"auctions":[{"id":1,"item":{"id":10},"buyout":500,"quantity":1,"time_left":"LONG"}]}'
+
+
+class StubBlizzApiHandler(BaseHTTPRequestHandler):
+    """
+    OAuth token endpoint and auctions endpoint honouring If-Modified-Since,
+    '/error' paths respond with 500.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status: int, body: bytes = b'', headers: dict = {}) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        self.server.token_requests += 1
+        self._send(200, b'{"access_token":"stub","token_type":"bearer","expires_in":86399}')
+
+    def do_GET(self) -> None:
+        self.server.requests.append((self.path, self.headers.get('If-Modified-Since')))
+
+        if self.path.startswith('/error'):
+            self._send(500, b'{"code":500}')
+
+        elif self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+            self._send(304)
+
+        else:
+            self._send(200, PAYLOAD, {'Last-Modified': LAST_MODIFIED})
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubBlizzApiHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.token_requests = 0
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    # no token cached by other tests, all the token requests go to the stub
+    monkeypatch.setattr(BlizzApi, 'TOKEN_URL', f'{base_url}/oauth/token')
+    monkeypatch.setattr(BlizzApi, '_token', None)
+    monkeypatch.setattr(BlizzApi, '_token_expires', 0.0)
+
+    yield base_url, server
+
+    server.shutdown()
+    server.server_close()
+
+
+async def fetch_all(urls: list, last_modified: dict = None) -> tuple:
+    async with AsyncBlizzApi(concurrency=2, last_modified=last_modified) as api:
+        bodies = await asyncio.gather(*(api.fetch(url) for url in urls))
+
+    return bodies, api.modified
+
+
+def test_fetch_records_last_modified_and_skips_unchanged(stub_api):
+    base_url, server = stub_api
+    url = f'{base_url}/auctions/2?access_token='
+
+    bodies, modified = asyncio.run(fetch_all([url, url]))
+    assert bodies == [PAYLOAD, PAYLOAD]
+    assert modified == {url: LAST_MODIFIED}
+
+    bodies, modified = asyncio.run(fetch_all([url], last_modified=modified))
+    assert bodies == [None]
+    assert modified == {}
+
+    assert server.requests[-1] == ('/auctions/2?access_token=stub', LAST_MODIFIED)
+    # token is shared by both clients
+    assert server.token_requests == 1
+
+
+def test_fetch_raises_on_error_statuses(stub_api):
+    base_url, server = stub_api
+
+    with pytest.raises(BlizzApiError):
+        asyncio.run(fetch_all([f'{base_url}/error?access_token=']))
+
+
+def test_fetch_raises_retried_error_on_connection_failures(stub_api):
+    base_url, server = stub_api
+
+    # token first, then the auction house server goes away
+    asyncio.run(fetch_all([f'{base_url}/auctions/2?access_token=']))
+    server.shutdown()
+    server.server_close()
+
+    with pytest.raises(BlizzApiError):
+        asyncio.run(fetch_all([f'{base_url}/auctions/2?access_token=']))
+
+
+class StubWriteHandler:
+    """
+    RealmWriteHandler stand-in: auction houses are fetched from the stub, nothing is written.
+    """
+    REALM_LIST_EU = {4440: 'everlook', 4441: 'auberdine'}
+    FACTIONS = {'a': 2, 'h': 6}
+
+    base_url = None
+    fail_publish = False
+
+    def __init__(self, delta: bool = False, archive=None):
+        self.time = '2026-01-01 12:00:00'
+        self.written = []
+
+    def auction_url(self, realm_id: int, faction_sign: str) -> str:
+        return f'{self.base_url}/auctions/{realm_id}/{faction_sign}?access_token='
+
+    def write_payload(self, realm_id: int, faction_sign: str, payload: bytes) -> int:
+        self.written.append((realm_id, faction_sign))
+        return 1
+
+    def publish(self, jobs) -> bool:
+        if self.fail_publish:
+            raise RuntimeError('publish failed')
+        return True
+
+
+def test_async_session_persists_last_modified_of_published_jobs(stub_api, tmp_path, monkeypatch):
+    base_url, server = stub_api
+    path = tmp_path / 'last_modified.json'
+
+    monkeypatch.setattr(controller, 'RealmWriteHandler', StubWriteHandler)
+    monkeypatch.setattr(controller, 'LAST_MODIFIED_PATH', path)
+    monkeypatch.setattr(StubWriteHandler, 'base_url', base_url)
+
+    # failed publish stores nothing, every auction house is fetched again
+    monkeypatch.setattr(StubWriteHandler, 'fail_publish', True)
+    with pytest.raises(RuntimeError):
+        controller.run_async_auction_writes(workers=2, retries=0)
+    assert not path.exists()
+
+    monkeypatch.setattr(StubWriteHandler, 'fail_publish', False)
+    results = controller.run_async_auction_writes(workers=2, retries=0)
+    assert [result['unchanged'] for result in results] == [False] * 4
+
+    stored = json.loads(path.read_text())
+    assert stored == {
+        f'{base_url}/auctions/{realm_id}/{faction_sign}?access_token=': LAST_MODIFIED
+        for realm_id in StubWriteHandler.REALM_LIST_EU
+        for faction_sign in StubWriteHandler.FACTIONS
+    }
+
+    # next session sends stored headers back and skips all the unchanged auction houses
+    results = controller.run_async_auction_writes(workers=2, retries=0)
+    assert [result['unchanged'] for result in results] == [True] * 4
+    assert [result['rows'] for result in results] == [0] * 4
+    assert all(if_modified_since == LAST_MODIFIED for _, if_modified_since in server.requests[-4:])
+    assert json.loads(path.read_text()) == stored
@@ -0,0 +1,163 @@
+"""
+Streaming ingest tests, no database or BlizzAPI involved.
+"""
+
+import json
+
+import pytest
+
+from src.handlers.database import RealmWriteHandler
+from src.handlers.exceptions import BlizzApiError
+from src.handlers.ingest import AuctionColumnExtractor, AuctionStreamParser
+
+
+TIME = '2026-01-01 12:00:00'
+
+AUCTIONS = [
+    {'id': 1, 'item': {'id': 10}, 'buyout': 500, 'quantity': 1, 'time_left': 'LONG'},
+    # bid only, no buyout key at all
+    {'id': 2, 'item': {'id': 10}, 'bid': 100, 'quantity': 1, 'time_left': 'SHORT'},
+    {'id': 3, 'item': {'id': 11, 'modifiers': [{'type': 9, 'value': 1}]}, 'buyout': 0, 'quantity': 2, 'time_left': 'LONG'},
+    {'id': 4, 'item': {'id': 12}, 'buyout': 1200, 'quantity': 4, 'time_left': 'SOMEDAY'},
+    {'id': 5, 'item': {'id': 13}, 'buyout': 700, 'quantity': 7, 'time_left': 'VERY_LONG'},
+]
+
+
+def payload(auctions: list = AUCTIONS, **dump_options) -> bytes:
+    return json.dumps(
+        {'_links': {'self': {'href': 'https://eu.api.blizzard.com/'}}, 'auctions': auctions, 'name': 'Żółw'},
+        ensure_ascii=False,
+        **dump_options
+    ).encode()
+
+
+def chunked(data: bytes, size: int) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def write_handler() -> RealmWriteHandler:
+    # no database connection, only the row formatting part is exercised
+    handler = RealmWriteHandler.__new__(RealmWriteHandler)
+    handler.time = TIME
+    handler.extractor = AuctionColumnExtractor(RealmWriteHandler.TIME_LEFT)
+
+    return handler
+
+
+def test_parser_yields_all_auctions_whatever_the_chunk_size():
+    for size in (1, 7, 64, 1 << 20):
+        assert list(AuctionStreamParser(chunked(payload(), size))) == AUCTIONS
+
+
+def test_parser_handles_formatted_payloads():
+    assert list(AuctionStreamParser(chunked(payload(indent=2), 5))) == AUCTIONS
+
+
+def test_parser_without_auctions():
+    assert list(AuctionStreamParser([b'{"_links": {}, "code": 404}'])) == []
+    assert list(AuctionStreamParser(chunked(payload([]), 3))) == []
+
+
+def test_stream_rows_drop_bid_only_auctions_and_write_nulls():
+    rows = list(write_handler()._stream_rows(chunked(payload(), 11), 'a'))
+
+    assert rows == [
+        f'a,1,10,500,1,{TIME},3\n',
+        f'a,4,12,1200,4,{TIME},\n',
+        f'a,5,13,700,7,{TIME},4\n',
+    ]
+
+
+def test_stream_rows_of_compact_payloads_extracted_in_slices():
+    expected = list(write_handler()._stream_rows([payload()], 'h'))
+
+    handler = write_handler()
+    handler.extractor.slice_size = 64
+    compact = payload(separators=(',', ':'))
+
+    assert len(list(handler.extractor.extract_chunks(chunked(compact, 11)))) > 1
+    assert list(handler._stream_rows(chunked(compact, 11), 'h')) == expected
+
+
+def test_slices_not_matched_by_the_expression_are_decoded():
+    extractor = AuctionColumnExtractor(RealmWriteHandler.TIME_LEFT, slice_size=32)
+
+    # quantity first, a key order the regular expression does not expect
+    reordered = [
+        {'id': auction['id'], 'quantity': auction['quantity'], **auction}
+        for auction in AUCTIONS
+    ]
+    compact = payload(reordered, separators=(',', ':'))
+    assert extractor._match(compact) is None
+
+    wow_ids = [
+        wow_id
+        for columns in extractor.extract_chunks(chunked(compact, 5))
+        for wow_id in columns['wow_id'].tolist()
+    ]
+    assert wow_ids == [1, 4, 5]
+
+
+def test_error_responses_are_not_empty_auction_houses():
+    extractor = AuctionColumnExtractor(RealmWriteHandler.TIME_LEFT)
+
+    with pytest.raises(BlizzApiError):
+        extractor.extract(b'{"code":429,"type":"BLZWEBAPI00000429","detail":"Too Many Requests"}')
+
+    with pytest.raises(BlizzApiError):
+        list(write_handler()._stream_rows([b'{"code":500,', b'"detail":"Internal server error"}'], 'a'))
+
+    assert list(write_handler()._stream_rows(chunked(payload([]), 3), 'a')) == []
+
+    for body in (b'[]', b'<html>Bad Gateway</html>', b'{"detail":"Not Found"}'):
+        with pytest.raises(BlizzApiError):
+            extractor.extract(body)
+
+
+def test_auction_houses_with_no_auctions_key_are_empty():
+    extractor = AuctionColumnExtractor(RealmWriteHandler.TIME_LEFT)
+    empty = b'{"_links":{"self":{"href":"https://eu.api.blizzard.com/"}},"connected_realm":{"href":"x"},"id":2}'
+
+    assert all(len(values) == 0 for values in extractor.extract(empty).values())
+    assert list(write_handler()._stream_rows(chunked(empty, 7), 'a')) == []
+
+
+class CopyConnection:
+    """
+    Stand-in connection, its COPY reads the whole source as psycopg2 would.
+    """
+    def __init__(self):
+        self.closed = False
+        self.committed = False
+
+    def cursor(self):
+        return self
+
+    def copy_expert(self, query, source):
+        self.copied = source.read()
+        self.rowcount = self.copied.count('\n')
+
+    def execute(self, query):
+        pass
+
+    def commit(self):
+        self.committed = True
+
+    def close(self):
+        self.closed = True
+
+
+def test_copy_connection_is_closed_when_the_stream_fails():
+    handler = write_handler()
+    connection = CopyConnection()
+    handler.get_connection = lambda: connection
+
+    with pytest.raises(BlizzApiError):
+        handler._copy_rows(4440, 'a', handler._stream_rows([b'{"code":500,"detail":"error"}'], 'a'))
+
+    assert connection.closed
+    assert not connection.committed
+
+    connection = CopyConnection()
+    assert handler._copy_rows(4440, 'a', handler._stream_rows(chunked(payload(), 11), 'a')) == 3
+    assert connection.closed and connection.committed
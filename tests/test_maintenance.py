@@ -0,0 +1,75 @@
+"""
+Maintenance handlers tests, statements are recorded instead of executed.
+"""
+
+import re
+
+from datetime import date
+
+from src.handlers.database import AuctionDeleteHandler, QueryMixin, RealmTableMigrator
+
+
+class RecordingCursor:
+    def __init__(self, fetched: list = ()):
+        self.executed = []
+        self.fetched = list(fetched)
+
+    def execute(self, query, params=None):
+        self.executed.append(query)
+
+    def fetchone(self):
+        return self.fetched.pop(0)
+
+    def fetchall(self):
+        return self.fetched.pop(0)
+
+
+class RecordingConnection:
+    def commit(self):
+        pass
+
+
+def recording(handler_class, fetched: list = ()):
+    # no database connection, statements are only recorded
+    handler = handler_class.__new__(handler_class)
+    handler.connection = RecordingConnection()
+    handler.cursor = RecordingCursor(fetched)
+    handler.REALM_LIST_EU = {4440: 'everlook'}
+
+    return handler
+
+
+def test_delete_data_clears_all_the_auction_tables():
+    handler = recording(AuctionDeleteHandler)
+    handler.START()
+
+    deleted = re.findall(r'DELETE FROM (\w+)', '\n'.join(handler.cursor.executed))
+
+    assert sorted(deleted) == sorted([
+        'realm_everlook',
+        'live_everlook',
+        'auction_intervals_everlook',
+        'item_stats_everlook',
+        'item_rollup_everlook',
+    ])
+
+
+def test_migrated_history_gets_item_stats():
+    # legacy, not partitioned table of a single day
+    handler = recording(RealmTableMigrator, [('r',), [(date(2026, 1, 1),)]])
+    handler.START()
+
+    executed = handler.cursor.executed
+    migrated = executed.index(QueryMixin.MIGRATE_LEGACY_REALM.format('everlook'))
+    aggregated = executed.index(QueryMixin.AGGREGATE_ITEM_STATS.format('everlook', 'TRUE', 'realm_everlook'))
+
+    assert migrated < aggregated
+    assert QueryMixin.CREATE_ITEM_STATS.format('everlook') in executed[:aggregated]
+
+
+def test_partitioned_tables_are_not_aggregated_again():
+    handler = recording(RealmTableMigrator, [('p',)])
+    handler.START()
+
+    assert not any('INSERT INTO item_stats_everlook' in query for query in handler.cursor.executed)
+    assert QueryMixin.CREATE_ITEM_STATS.format('everlook') in handler.cursor.executed
@@ -0,0 +1,24 @@
+"""
+Live auction keyset pagination tests, no database involved.
+"""
+
+import pytest
+
+from src.handlers.database import AuctionReadHandler
+
+
+def test_cursor_round_trip():
+    for wow_id in (0, 1, 123456789, 2 ** 40):
+        cursor = AuctionReadHandler.encode_cursor(wow_id)
+
+        assert AuctionReadHandler.decode_cursor(cursor) == wow_id
+
+
+def test_empty_cursor_is_the_first_page():
+    assert AuctionReadHandler.decode_cursor('') == -1
+
+
+@pytest.mark.parametrize('page_cursor', ['x', 'not a cursor', 'YWJj', '!!!!', 'w6E='])
+def test_malformed_cursor_raises_value_error(page_cursor):
+    with pytest.raises(ValueError):
+        AuctionReadHandler.decode_cursor(page_cursor)
@@ -0,0 +1,48 @@
+"""
+Live auction read caching tests, no database involved.
+"""
+
+from src.handlers.read_cache import ReadCache
+from src.handlers.snapshot import SnapshotClock
+
+
+def test_entries_are_kept_until_next_snapshot():
+    cache = ReadCache('test')
+    generation = SnapshotClock.generation
+
+    assert cache.get('key') is None
+    cache.set('key', 'value', generation)
+    assert cache.get('key') == 'value'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    SnapshotClock.invalidate()
+
+    assert cache.get('key') is None
+    assert len(cache) == 0
+
+
+def test_values_of_previous_snapshots_are_not_stored():
+    cache = ReadCache('test')
+    generation = SnapshotClock.generation
+
+    # snapshot published while the value was being read
+    SnapshotClock.invalidate()
+    cache.set('key', 'stale', generation)
+
+    assert cache.get('key') is None
+
+    cache.set('key', 'fresh', SnapshotClock.generation)
+    assert cache.get('key') == 'fresh'
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ReadCache('test', max_entries=2)
+    generation = SnapshotClock.generation
+
+    cache.set('a', 1, generation)
+    cache.set('b', 2, generation)
+    cache.get('a')
+    cache.set('c', 3, generation)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
@@ -0,0 +1,116 @@
+"""
+ItemSearchIndex tests.
+"""
+
+import threading
+
+from src.handlers.search import ItemSearchIndex
+
+
+ITEMS = [
+    (1, 'Linen Cloth', 'linen-cloth'),
+    (2, 'Bolt of Linen Cloth', 'bolt-of-linen-cloth'),
+    (3, 'Black Lotus', 'black-lotus'),
+    (4, 'Brilliant Mana Oil', 'brilliant-mana-oil'),
+    (5, 'Brilliant Wizard Oil', 'brilliant-wizard-oil'),
+    (6, 'Linen', 'linen'),
+    (7, 'Silk Cloth', 'silk-cloth'),
+]
+
+
+def index(rows: list = ITEMS) -> ItemSearchIndex:
+    search_index = ItemSearchIndex()
+    search_index.build(rows)
+
+    return search_index
+
+
+def ids(rows: list) -> list:
+    return [row[0] for row in rows]
+
+
+def test_empty_index_is_not_ready():
+    assert not index([]).ready
+    assert index().ready
+
+
+def test_substring_matches():
+    search_index = index()
+
+    assert search_index.match_ids('linen') == {1, 2, 6}
+    assert search_index.match_ids('n-c') == {1, 2}
+    assert search_index.match_ids('o') == {1, 2, 3, 4, 5, 7}
+    assert search_index.match_ids('') == {1, 2, 3, 4, 5, 6, 7}
+    assert search_index.match_ids('mithril') == set()
+
+
+def test_ranking_exact_prefix_word_prefix_substring():
+    search_index = index()
+
+    # exact, prefix, word prefix
+    assert ids(search_index.search('linen', 0, 10)) == [6, 1, 2]
+    # word prefixes, shorter slugs first
+    assert ids(search_index.search('cloth', 0, 10)) == [7, 1, 2]
+    assert ids(search_index.search('Cloth', 1, 1)) == [1]
+    # prefixes, then word prefix
+    assert ids(search_index.search('lin', 0, 3)) == [6, 1, 2]
+    # prefixes, word prefix, then substrings
+    assert ids(search_index.search('li', 0, 10)) == [6, 1, 2, 4, 5]
+
+
+def test_typos_match_single_words_of_longer_slugs():
+    search_index = index()
+
+    assert set(ids(search_index.search('brillant', 0, 10))) == {4, 5}
+    assert ids(search_index.search('lotos', 0, 10)) == [3]
+    assert ids(search_index.search('lnen', 0, 3)) == [6, 1, 2]
+
+    # every query word has to match
+    assert ids(search_index.search('brillant-wizrd', 0, 10)) == [5]
+    assert ids(search_index.search('brillant-lotos', 0, 10)) == []
+
+
+def test_fuzzy_matches_follow_exact_ones():
+    search_index = index()
+
+    assert ids(search_index.search('silk', 0, 10)) == [7]
+    assert ids(search_index.search('linen-clth', 0, 10))[:2] == [1, 2]
+
+
+def test_rebuild_replaces_index_and_cached_results():
+    search_index = index()
+    assert ids(search_index.search('lotus', 0, 10)) == [3]
+
+    search_index.build(ITEMS[:2])
+    assert ids(search_index.search('lotus', 0, 10)) == []
+    assert search_index.match_ids('') == {1, 2}
+
+
+def test_queries_racing_rebuilds():
+    search_index = index()
+    errors = []
+    stop = threading.Event()
+
+    def query():
+        while not stop.is_set():
+            try:
+                for text in ('linen', 'cloth', 'lotos', 'brillant', 'o'):
+                    search_index.search(text, 0, 5)
+                    search_index.match_ids(text)
+
+            except Exception as e:
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=query) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+
+    for i in range(200):
+        search_index.build(ITEMS[i % 2::2] if i % 3 else ITEMS)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
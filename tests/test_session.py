@@ -0,0 +1,107 @@
+"""
+Write session pool and metrics tests, no database or BlizzAPI involved.
+"""
+
+from collections import Counter as Attempts
+
+from src.handlers import multiprocess_manager
+from src.handlers.exceptions import BlizzApiError, TimeoutError
+from src.handlers.metrics import ROWS_INGESTED, MetricsRegistry, registry
+
+
+# attempts per job, within a single worker process
+attempts = Attempts()
+
+
+def flaky_job(realm_id: int, faction_sign: str, failures: int, error: type = TimeoutError) -> int:
+    """
+    Fails the first 'failures' attempts, then writes realm_id rows.
+    """
+    attempts[realm_id, faction_sign] += 1
+
+    if attempts[realm_id, faction_sign] <= failures:
+        raise error(realm_id)
+
+    ROWS_INGESTED.inc(realm_id, realm=str(realm_id))
+
+    return realm_id
+
+
+def run(jobs: list, retries: int = 3) -> dict:
+    completed = []
+    results = multiprocess_manager.run_session(
+        func=       flaky_job,
+        jobs=       jobs,
+        workers=    2,
+        retries=    retries,
+        backoff=    0.0,
+        callback=   completed.append
+    )
+
+    assert completed == results
+
+    return {result['job'][:2]: result for result in results}
+
+
+def test_jobs_are_retried_on_blizz_api_failures():
+    results = run([(10, 'a', 0), (20, 'h', 2), (30, 'a', 3, BlizzApiError)])
+
+    assert results[10, 'a']['attempts'] == 1
+    assert results[20, 'h']['attempts'] == 3
+    assert results[30, 'a']['attempts'] == 4
+    assert [results[job]['rows'] for job in sorted(results)] == [10, 20, 30]
+    assert all(result['error'] is None for result in results.values())
+
+
+def test_failures_are_reported_once_retries_run_out():
+    results = run([(10, 'a', 5), (20, 'h', 0)], retries=2)
+
+    assert results[10, 'a']['rows'] is None
+    assert results[10, 'a']['error'] == repr(TimeoutError(10))
+    assert results[10, 'a']['attempts'] == 3
+    assert results[20, 'h']['rows'] == 20
+
+
+def test_other_errors_are_not_retried():
+    results = run([(10, 'a', 1, KeyError)])
+
+    assert results[10, 'a']['error'] == repr(KeyError(10))
+    assert results[10, 'a']['attempts'] == 1
+
+
+def test_job_metrics_are_shipped_back_to_the_parent():
+    registry.reset()
+    results = run([(10, 'a', 0), (20, 'h', 1)])
+
+    # workers' metrics are not shared with the parent process
+    assert ROWS_INGESTED.collect() == {}
+
+    for result in results.values():
+        registry.merge(result['metrics'])
+
+    assert ROWS_INGESTED.collect() == {('10',): 10.0, ('20',): 20.0}
+    registry.reset()
+
+
+def test_registry_renders_prometheus_text_format():
+    metrics = MetricsRegistry()
+    counter = metrics.counter('test_total', 'Test counter.', ('realm',))
+    histogram = metrics.histogram('test_seconds', 'Test histogram.')
+
+    counter.inc(2, realm='everlook')
+    histogram.buckets = (0.1, 1.0)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    assert metrics.render().splitlines() == [
+        '# HELP test_total Test counter.',
+        '# TYPE test_total counter',
+        'test_total{realm="everlook"} 2.0',
+        '# HELP test_seconds Test histogram.',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{le="0.1"} 0',
+        'test_seconds_bucket{le="1.0"} 1',
+        'test_seconds_bucket{le="+Inf"} 2',
+        'test_seconds_sum 5.5',
+        'test_seconds_count 2',
+    ]
@@ -0,0 +1,36 @@
+"""
+StatsCalculator tests.
+"""
+
+import numpy as np
+
+from src.handlers.database import ItemReadHandler
+from src.handlers.stats import StatsCalculator
+
+
+def history() -> tuple:
+    times = np.array(['2026-01-01T10:00:00'] * 4 + ['2026-01-01T11:00:00'] * 3, dtype='datetime64[s]')
+    buyouts = np.array([100, 400, 90, 1000, 50, 70, 300])
+    quantities = np.array([1, 2, 3, 1, 1, 1, 6])
+
+    return times, buyouts, quantities
+
+
+def test_computed_stats_have_pre_aggregated_stats_keys():
+    assert tuple(StatsCalculator.get_all(*history())) == ItemReadHandler.STATS_KEYS
+
+
+def test_snapshot_stats():
+    stats = StatsCalculator.get_all(*history())
+    snapshot = '2026-01-01 10:00:00'
+    unit_prices = [100, 200, 30, 1000]
+
+    assert stats['lowest'][snapshot] == 30
+    assert stats['count'][snapshot] == 4
+    assert stats['quantity'][snapshot] == 7
+    assert np.isclose(stats['median'][snapshot], np.median(unit_prices))
+    assert np.isclose(stats['percentile_25'][snapshot], np.percentile(unit_prices, 25))
+    assert np.isclose(stats['percentile_75'][snapshot], np.percentile(unit_prices, 75))
+    assert np.isclose(stats['weighted_mean'][snapshot], 1590 / 7)
+    # units sorted by price: 30 x3, 100 x1, 200 x2, 1000 x1, half of them is 3.5
+    assert stats['weighted_median'][snapshot] == 100
@@ -0,0 +1,96 @@
+"""
+QueryTracer tests, no database involved.
+"""
+
+from src.handlers.database import AuctionReadHandler, CrossRealmReadHandler, QueryMixin
+from src.handlers.snapshot import SnapshotClock
+from src.handlers.tracing import QueryTracer
+
+
+class FakeCursor:
+    rowcount = 1
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, params=None):
+        self.connection.executed.append(query)
+
+    def fetchall(self):
+        return [('Seq Scan on live_everlook',)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    autocommit = False
+
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+
+def traced(query: str) -> list:
+    """
+    Records a slow query, returns all the statements executed by the tracer itself.
+    """
+    tracer = QueryTracer()
+    tracer.enable(threshold=0.0)
+
+    connection = FakeConnection()
+    tracer.record(FakeCursor(connection), query, None, 1.0)
+
+    assert len(tracer.slow) == 1
+
+    return connection.executed
+
+
+def explained(query: str) -> bool:
+    return any(statement.startswith('EXPLAIN') for statement in traced(query))
+
+
+def test_lock_unlock_and_setval_are_never_explained():
+    for query in (
+        QueryMixin.LOCK_WRITE_SESSION,
+        QueryMixin.UNLOCK_WRITE_SESSION,
+        QueryMixin.MIGRATE_LEGACY_REALM.format('everlook'),
+        "SELECT setval('realm_everlook_id_seq', COALESCE((SELECT MAX(id) FROM realm_everlook), 1))",
+        "SELECT nextval('realm_everlook_id_seq')",
+    ):
+        assert not QueryTracer.explainable(query)
+        assert traced(query) == []
+
+
+def test_writes_and_multiple_statements_are_never_explained():
+    for query in (
+        QueryMixin.DELETE_AUCTION_DATA.format('everlook'),
+        QueryMixin.REPLACE_LIVE_AUCTIONS.format('everlook', 'staging_everlook_a'),
+        QueryMixin.AGGREGATE_ITEM_STATS.format('everlook', 'TRUE', 'realm_everlook'),
+        'SELECT 1; DELETE FROM live_everlook',
+    ):
+        assert not explained(query)
+
+
+def test_plain_reads_are_explained_within_a_savepoint():
+    query = SnapshotClock.READ_LATEST_TIME
+
+    assert traced(query) == [
+        'SAVEPOINT query_tracer',
+        'EXPLAIN (ANALYZE, BUFFERS) ' + query,
+        'ROLLBACK TO SAVEPOINT query_tracer',
+    ]
+
+
+def test_read_queries_are_explainable():
+    for query in (
+        AuctionReadHandler.READ_AUCTION_COUNT.format('everlook', AuctionReadHandler.SLUG_LIKE),
+        QueryMixin.READ_ITEMS_STATS.format('everlook'),
+        QueryMixin.READ_ITEMS_DATA.format('everlook'),
+        CrossRealmReadHandler.READ_LATEST_ITEM_STATS.format('everlook', 'a'),
+        "SELECT * FROM item_data WHERE name_slug LIKE 'set(val)'",
+        'EXECUTE read_auction_data_everlook_ids(%s, %s, %s, %s)',
+    ):
+        assert QueryTracer.explainable(query), query